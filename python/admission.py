@@ -0,0 +1,133 @@
+"""
+Admission Control
+=================
+
+Bounded concurrency pools that shed load instead of letting heavy requests
+pile up.
+
+Each pool admits up to ``concurrency`` requests at a time and lets at most
+``queue_size`` more wait, each for up to ``queue_timeout`` seconds. A
+request that finds the queue full is rejected immediately (HTTP 429);
+one that waits too long is rejected with HTTP 503. Both rejections carry a
+Retry-After estimate based on the pool's recent service times. Separate
+pools for cheap reads and heavy compute keep a burst of heavy work from
+occupying every server thread.
+
+Author: PLP Academic Management System
+Version: 1.0
+Purpose: Capstone Project - Smart Academic Management System
+"""
+
+import math
+import threading
+import time
+
+# Weight of the newest sample in the service time moving average
+SERVICE_TIME_SMOOTHING = 0.2
+
+
+class Rejected(Exception):
+    """A request was not admitted to a pool"""
+
+    def __init__(self, pool, reason, status, retry_after):
+        super().__init__(f"{pool} pool {reason.replace('_', ' ')}")
+        self.pool = pool
+        self.reason = reason
+        self.status = status
+        self.retry_after = retry_after
+
+
+class AdmissionPool:
+    """Concurrency limit with a bounded, time-limited wait queue"""
+
+    def __init__(self, name, concurrency, queue_size=0, queue_timeout=1.0):
+        """
+        Initialize the pool
+
+        Args:
+            name (str): Pool name used in errors and stats
+            concurrency (int): Requests allowed to run at the same time
+            queue_size (int): Requests allowed to wait for a slot
+            queue_timeout (float): Seconds a request may wait before it is rejected
+        """
+        self.name = name
+        self.concurrency = concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self.service_time = None
+        self.counts = {'admitted': 0, 'queued': 0, 'rejected_queue_full': 0, 'rejected_timeout': 0}
+        self._condition = threading.Condition()
+
+    def acquire(self):
+        """
+        Take a slot, waiting in the queue if needed
+
+        Returns:
+            float: Admission time, to be passed to release()
+
+        Raises:
+            Rejected: The queue is full (429) or the wait timed out (503)
+        """
+        with self._condition:
+            if self.active >= self.concurrency:
+                if self.waiting >= self.queue_size:
+                    self.counts['rejected_queue_full'] += 1
+                    raise Rejected(self.name, 'queue_full', 429, self._retry_after())
+
+                self.counts['queued'] += 1
+                self.waiting += 1
+                deadline = time.monotonic() + self.queue_timeout
+                try:
+                    while self.active >= self.concurrency:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self.counts['rejected_timeout'] += 1
+                            raise Rejected(self.name, 'queue_timeout', 503, self._retry_after())
+                        self._condition.wait(remaining)
+                finally:
+                    self.waiting -= 1
+
+            self.active += 1
+            self.counts['admitted'] += 1
+            return time.monotonic()
+
+    def release(self, admitted_at):
+        """
+        Free a slot taken by acquire()
+
+        Args:
+            admitted_at (float): Value returned by acquire()
+        """
+        elapsed = time.monotonic() - admitted_at
+        with self._condition:
+            self.active -= 1
+            if self.service_time is None:
+                self.service_time = elapsed
+            else:
+                self.service_time += SERVICE_TIME_SMOOTHING * (elapsed - self.service_time)
+            self._condition.notify()
+
+    def _retry_after(self):
+        """Seconds until the current backlog should have drained (at least 1)"""
+        backlog = (self.active + self.waiting) / self.concurrency
+        return max(1, math.ceil(backlog * (self.service_time or 1.0)))
+
+    def stats(self):
+        """
+        Current load and admission counts
+
+        Returns:
+            dict: Limits, active/waiting requests, average service time and counts
+        """
+        with self._condition:
+            return {
+                'concurrency': self.concurrency,
+                'queue_size': self.queue_size,
+                'queue_timeout': self.queue_timeout,
+                'active': self.active,
+                'waiting': self.waiting,
+                'avg_service_seconds': round(self.service_time, 4) if self.service_time is not None else None,
+                **self.counts
+            }
@@ -0,0 +1,172 @@
+"""
+At-Risk Alert Tracker
+=====================
+
+Server-side sweep over the materialized predictions table that keeps the
+previous alert state and records only what changed between sweeps.
+
+A (student, LO) pair is at risk when its ensemble probability is below
+AT_RISK_PROBABILITY; urgency is 'high' below HIGH_URGENCY_PROBABILITY and
+'medium' otherwise (the same rule /api/recommendations uses for priority
+areas). Each sweep that changes anything gets a new alert version, so
+pollers can ask for everything since the version they last saw.
+
+Versions count per process. Forked API workers start from the master's
+history, so each tracker also has a stream ID that changes the first time a
+process sweeps on its own; a version is only meaningful together with the
+stream it came from.
+
+Author: PLP Academic Management System
+Version: 1.0
+Purpose: Capstone Project - Smart Academic Management System
+"""
+
+from collections import deque
+from datetime import datetime
+import os
+import threading
+import uuid
+
+import numpy as np
+import pandas as pd
+
+AT_RISK_PROBABILITY = 0.6
+HIGH_URGENCY_PROBABILITY = 0.4
+
+# Number of change sets kept for incremental polling
+ALERT_HISTORY_SIZE = 256
+
+_KEY = ['student_id', 'learning_outcome']
+
+
+class AlertTracker:
+    """Track at-risk (student, LO) pairs and the changes between sweeps"""
+
+    def __init__(self, history_size=ALERT_HISTORY_SIZE):
+        """
+        Initialize the AlertTracker
+
+        Args:
+            history_size (int): Number of change sets kept for polling
+        """
+        self.version = 0
+        self.stream = uuid.uuid4().hex[:12]
+        self._stream_pid = os.getpid()
+        self.state = pd.DataFrame({
+            'student_id': pd.Series(dtype='int64'),
+            'learning_outcome': pd.Series(dtype=object),
+            'urgency': pd.Series(dtype=object),
+            'probability': pd.Series(dtype=float)
+        })
+        self._history = deque(maxlen=history_size)
+        self._lock = threading.Lock()
+
+    def sweep(self, predictions):
+        """
+        Evaluate every (student, LO) prediction and record the changes
+
+        Args:
+            predictions (pd.DataFrame): Materialized predictions with student_id,
+                learning_outcome and ensemble_probability columns
+
+        Returns:
+            int: Number of alert changes recorded by this sweep
+        """
+        probability = predictions['ensemble_probability'].to_numpy(dtype=float)
+        at_risk = probability < AT_RISK_PROBABILITY
+
+        current = pd.DataFrame({
+            'student_id': predictions['student_id'].to_numpy()[at_risk],
+            'learning_outcome': predictions['learning_outcome'].to_numpy()[at_risk],
+            'urgency': np.where(probability[at_risk] < HIGH_URGENCY_PROBABILITY, 'high', 'medium'),
+            'probability': probability[at_risk]
+        })
+
+        with self._lock:
+            if os.getpid() != self._stream_pid:
+                # First sweep in a forked worker: its versions diverge from here on
+                self.stream = uuid.uuid4().hex[:12]
+                self._stream_pid = os.getpid()
+
+            merged = self.state.merge(current, on=_KEY, how='outer',
+                                      suffixes=('_previous', ''), indicator=True)
+
+            newly_at_risk = merged['_merge'] == 'right_only'
+            recovered = merged['_merge'] == 'left_only'
+            urgency_changed = (merged['_merge'] == 'both') & (merged['urgency'] != merged['urgency_previous'])
+
+            # Recovered pairs are not in `current`; report the probability they recovered to
+            recovered_rows = merged[recovered].drop(columns='probability').merge(
+                pd.DataFrame({
+                    'student_id': predictions['student_id'].to_numpy(),
+                    'learning_outcome': predictions['learning_outcome'].to_numpy(),
+                    'probability': probability
+                }),
+                on=_KEY, how='left'
+            )
+
+            changes = pd.concat([
+                self._events(merged[newly_at_risk], 'newly_at_risk'),
+                self._events(recovered_rows, 'recovered'),
+                self._events(merged[urgency_changed], 'urgency_changed')
+            ], ignore_index=True)
+
+            self.state = current
+            if len(changes):
+                self.version += 1
+                self._history.append((self.version, changes.assign(version=self.version)))
+
+            return len(changes)
+
+    @staticmethod
+    def _events(rows, event_type):
+        """Compact change records for one event type"""
+        events = pd.DataFrame({
+            'type': event_type,
+            'student_id': rows['student_id'].to_numpy(),
+            'learning_outcome': rows['learning_outcome'].to_numpy(),
+            'urgency': rows['urgency'].to_numpy(),
+            'previous_urgency': rows['urgency_previous'].to_numpy(),
+            'probability': rows['probability'].to_numpy(dtype=float)
+        })
+        # Recovered pairs have no current urgency, new ones no previous urgency
+        for column in ('urgency', 'previous_urgency'):
+            events[column] = events[column].astype(object).where(events[column].notna(), None)
+        return events
+
+    def changes_since(self, since=None, stream=None):
+        """
+        Alert changes after a given alert version
+
+        If the requested version is older than the retained history, comes
+        from another stream (or is not given), a reset is returned: the full
+        current at-risk list as 'newly_at_risk' events with 'reset' set.
+
+        Args:
+            since (int, optional): Last alert version the caller has seen
+            stream (str, optional): Stream the caller's version belongs to
+
+        Returns:
+            dict: 'stream', 'version', 'since', 'reset' and the list of change 'events'
+        """
+        with self._lock:
+            oldest = self._history[0][0] if self._history else self.version + 1
+            reset = (since is None or since < oldest - 1 or since > self.version
+                     or (stream is not None and stream != self.stream))
+
+            if reset:
+                events = self.state.assign(type='newly_at_risk', previous_urgency=None,
+                                           version=self.version)
+            else:
+                batches = [changes for version, changes in self._history if version > since]
+                events = pd.concat(batches, ignore_index=True) if batches else None
+
+            return {
+                'stream': self.stream,
+                'version': self.version,
+                'since': since,
+                'reset': reset,
+                'at_risk_count': int(len(self.state)),
+                'events': events,
+                'generated_at': datetime.now().isoformat()
+            }
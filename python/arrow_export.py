@@ -0,0 +1,191 @@
+"""
+Arrow IPC Bulk Export
+=====================
+
+Streams the analyzer's tables (student_lo_summary, the roster and the raw
+scores) as Arrow IPC record batches for analytics consumers.
+
+Each table is converted to an Arrow table once per data version and cached;
+numeric columns are taken over from pandas without copying. Requests then
+only filter (vectorized Arrow compute), project and slice that table, and
+the record batches are zero-copy slices written straight to the response
+stream, so no per-row Python objects are created.
+
+``pyarrow`` is optional; without it ``available()`` is False and the API
+answers export requests with 501.
+
+Author: PLP Academic Management System
+Version: 1.0
+Purpose: Capstone Project - Smart Academic Management System
+"""
+
+import threading
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pragma: no cover - optional dependency
+    pa = pc = None
+
+ARROW_STREAM_MIMETYPE = 'application/vnd.apache.arrow.stream'
+
+# Rows per record batch
+DEFAULT_BATCH_ROWS = 65536
+MAX_BATCH_ROWS = 1_000_000
+
+# Columns that can be filtered on with exact (comma-separated) values
+FILTER_COLUMNS = ['student_id', 'task_id', 'course', 'subject', 'learning_outcome']
+INTEGER_FILTER_COLUMNS = {'student_id', 'task_id'}
+
+
+def available():
+    """Whether pyarrow is installed"""
+    return pa is not None
+
+
+def _export_frames(analyzer):
+    """The exportable tables of an analyzer (raw scores include percentage_score)"""
+    return {
+        'summary': analyzer.student_lo_summary,
+        'roster': analyzer.roster,
+        'scores': analyzer.data
+    }
+
+
+class _ChunkSink:
+    """Write-only file object that hands out what was written since the last drain"""
+
+    closed = False
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+class ArrowExporter:
+    """Per-data-version cache of Arrow tables with filtered, projected streaming"""
+
+    def __init__(self):
+        """Initialize an empty cache"""
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def table(self, analyzer, name):
+        """
+        Arrow version of one of the analyzer's tables, converted once per data version
+
+        Args:
+            analyzer (LOAnalyzer): Analyzer holding the data
+            name (str): 'summary', 'roster' or 'scores'
+
+        Returns:
+            pyarrow.Table: Cached table
+        """
+        frame = _export_frames(analyzer)[name]
+        key = (id(analyzer), analyzer.data_version, id(frame))
+
+        with self._lock:
+            cached = self._tables.get(name)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        with self._lock:
+            self._tables[name] = (key, table)
+        return table
+
+    def prepare(self, analyzer, name, columns=None, filters=None, date_from=None, date_to=None):
+        """
+        Filter and project one table
+
+        Args:
+            analyzer (LOAnalyzer): Analyzer holding the data
+            name (str): 'summary', 'roster' or 'scores'
+            columns (list, optional): Columns to keep, in this order (default: all)
+            filters (dict, optional): column -> list of accepted values (FILTER_COLUMNS only)
+            date_from (str, optional): First submission date to include (scores only)
+            date_to (str, optional): Last submission date to include (scores only)
+
+        Returns:
+            pyarrow.Table: Selected rows and columns
+
+        Raises:
+            ValueError: Unknown table, column or filter
+        """
+        if name not in ('summary', 'roster', 'scores'):
+            raise ValueError(f"Unknown table '{name}'; use summary, roster or scores")
+
+        table = self.table(analyzer, name)
+        mask = None
+
+        def restrict(condition):
+            nonlocal mask
+            mask = condition if mask is None else pc.and_(mask, condition)
+
+        for column, values in (filters or {}).items():
+            if column not in FILTER_COLUMNS or column not in table.column_names:
+                raise ValueError(f"Cannot filter table '{name}' on '{column}'")
+            if column in INTEGER_FILTER_COLUMNS:
+                try:
+                    values = [int(value) for value in values]
+                except ValueError:
+                    raise ValueError(f"'{column}' filter values must be integers")
+            restrict(pc.is_in(table[column], value_set=pa.array(values, type=table.schema.field(column).type)))
+
+        if date_from is not None or date_to is not None:
+            if 'date_submitted' not in table.column_names:
+                raise ValueError(f"Table '{name}' has no submission dates")
+            dates = table['date_submitted']
+            if date_from is not None:
+                restrict(pc.greater_equal(dates, pa.scalar(pd.Timestamp(date_from), type=dates.type)))
+            if date_to is not None:
+                # Whole last day
+                end = pd.Timestamp(date_to) + pd.Timedelta(days=1)
+                restrict(pc.less(dates, pa.scalar(end, type=dates.type)))
+
+        if mask is not None:
+            table = table.filter(mask)
+
+        if columns:
+            unknown = [column for column in columns if column not in table.column_names]
+            if unknown:
+                raise ValueError(f"Unknown columns for table '{name}': {unknown}")
+            table = table.select(columns)
+
+        return table
+
+    @staticmethod
+    def stream(table, batch_rows=DEFAULT_BATCH_ROWS):
+        """
+        Encode a table as an Arrow IPC stream, one chunk per record batch
+
+        Args:
+            table (pyarrow.Table): Table to send
+            batch_rows (int): Maximum rows per record batch
+
+        Yields:
+            bytes: Consecutive pieces of the IPC stream
+        """
+        sink = _ChunkSink()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            batches = table.to_batches(max_chunksize=batch_rows)
+            if not batches:
+                # Make sure the schema is sent for an empty result
+                writer.write_batch(pa.RecordBatch.from_pylist([], schema=table.schema))
+            for batch in batches:
+                writer.write_batch(batch)
+                yield sink.drain()
+        yield sink.drain()
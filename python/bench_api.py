@@ -0,0 +1,140 @@
+"""
+LO Analysis API Load Benchmark
+==============================
+
+Small load generator for the Flask API. Runs a fixed mix of requests from
+several concurrent clients for a given duration and reports throughput and
+latency percentiles per endpoint.
+
+Usage:
+    python python/bench_api.py --url http://127.0.0.1:5000 --concurrency 16 --duration 30
+
+Author: PLP Academic Management System
+Version: 1.0
+Purpose: Capstone Project - Smart Academic Management System
+"""
+
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# (method, path, JSON body) requests cycled through by every client
+DEFAULT_MIX = [
+    ('GET', '/api/health', None),
+    ('GET', '/api/curriculum/mapping', None),
+    ('GET', '/api/students/list?limit=50', None),
+    ('GET', '/api/analyze/class', None),
+    ('GET', '/api/groups/students', None),
+    ('GET', '/api/report/student/2', None),
+    ('GET', '/api/recommendations/2', None),
+    ('POST', '/api/predict/student', {'student_id': 2}),
+    ('POST', '/api/predict/topic-to-lo', {'task_title': 'System Design Project'}),
+]
+
+
+def _request(base_url, method, path, body, timeout):
+    """Send one request and return (status, seconds)"""
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    req = urllib.request.Request(base_url + path, data=data, method=method,
+                                 headers={'Content-Type': 'application/json',
+                                          'Accept-Encoding': 'gzip'})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, OSError):
+        status = 0
+    return status, time.perf_counter() - started
+
+
+def run_benchmark(base_url, concurrency=8, duration=10.0, mix=None, timeout=30.0):
+    """
+    Hammer the API with a request mix and collect latency statistics
+
+    Args:
+        base_url (str): API base URL, e.g. http://127.0.0.1:5000
+        concurrency (int): Number of concurrent clients
+        duration (float): Benchmark duration in seconds
+        mix (list, optional): (method, path, body) requests (default: DEFAULT_MIX)
+        timeout (float): Per-request timeout in seconds
+
+    Returns:
+        dict: Per-endpoint and total throughput, error counts and latency percentiles
+    """
+    mix = mix or DEFAULT_MIX
+    samples = {f'{method} {path}': [] for method, path, _ in mix}
+    errors = {key: 0 for key in samples}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+
+    def client(offset):
+        i = offset
+        while time.perf_counter() < deadline:
+            method, path, body = mix[i % len(mix)]
+            status, elapsed = _request(base_url, method, path, body, timeout)
+            key = f'{method} {path}'
+            with lock:
+                samples[key].append(elapsed)
+                if status == 0 or status >= 500 or status == 429:
+                    errors[key] += 1
+            i += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for n in range(concurrency):
+            pool.submit(client, n)
+    elapsed = time.perf_counter() - started
+
+    def stats(latencies, error_count):
+        latencies = np.asarray(latencies) * 1000
+        if latencies.size == 0:
+            return {'requests': 0, 'errors': error_count}
+        return {
+            'requests': int(latencies.size),
+            'errors': error_count,
+            'rps': round(latencies.size / elapsed, 1),
+            'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+            'p95_ms': round(float(np.percentile(latencies, 95)), 2),
+            'p99_ms': round(float(np.percentile(latencies, 99)), 2),
+            'max_ms': round(float(latencies.max()), 2)
+        }
+
+    return {
+        'base_url': base_url,
+        'concurrency': concurrency,
+        'duration_seconds': round(elapsed, 2),
+        'endpoints': {key: stats(samples[key], errors[key]) for key in samples},
+        'total': stats([x for values in samples.values() for x in values], sum(errors.values()))
+    }
+
+
+def main():
+    """Command-line entry point"""
+    parser = argparse.ArgumentParser(description='Load benchmark for the LO Analysis API')
+    parser.add_argument('--url', default='http://127.0.0.1:5000', help='API base URL')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients')
+    parser.add_argument('--duration', type=float, default=10.0, help='Duration in seconds')
+    args = parser.parse_args()
+
+    print(f"🏁 Benchmarking {args.url} with {args.concurrency} clients for {args.duration:.0f}s...")
+    results = run_benchmark(args.url, args.concurrency, args.duration)
+
+    print(f"\n{'endpoint':<45} {'req':>6} {'err':>5} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for key, row in list(results['endpoints'].items()) + [('TOTAL', results['total'])]:
+        if not row['requests']:
+            continue
+        print(f"{key:<45} {row['requests']:>6} {row['errors']:>5} {row['rps']:>8} "
+              f"{row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8}")
+
+
+if __name__ == '__main__':
+    main()
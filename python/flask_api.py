@@ -10,7 +10,7 @@ Version: 1.0
 Purpose: Capstone Project - Smart Academic Management System
 """
 
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify, stream_with_context
 from flask_cors import CORS
 import json
 import pandas as pd
@@ -19,27 +19,220 @@ import os
 import sys
 
 # Import our custom LOAnalyzer
-from lo_analyzer import LOAnalyzer
+from lo_analyzer import LOAnalyzer, data_file_lock, file_signature
+from alerts import AT_RISK_PROBABILITY
+from neighbors import MAX_NEIGHBORS
+from singleflight import SingleFlight
+from admission import AdmissionPool, Rejected
+import arrow_export
+from shared_state import SharedStateReader
+from serialization import FastJSONProvider, frame_to_records, json_response, not_modified, version_etag
 
 app = Flask(__name__)
+app.json = FastJSONProvider(app)  # numpy/pandas-aware JSON encoding
 CORS(app)  # Enable CORS for frontend integration
 
 # Global analyzer instance
 analyzer = None
 
+# Coalesces concurrent identical heavy computations (per worker process)
+single_flight = SingleFlight()
+
+# Arrow tables for the bulk export endpoints, converted once per data version
+arrow_exporter = arrow_export.ArrowExporter()
+
+# Scores CSV backing the analyzer (relative to the repository root)
+DATA_FILE = os.environ.get('PLP_DATA_FILE', 'python/student_scores.csv')
+
+# Models saved by `lo_cli.py train`; loaded at startup instead of training (optional)
+MODEL_FILE = os.environ.get('PLP_MODEL_FILE')
+
+# Directory of the memory-mapped prediction state shared by all workers (optional).
+# The process that (re)builds the analyzer publishes a new version there; every
+# worker serves per-student predictions from the current version.
+SHARED_STATE_DIR = os.environ.get('PLP_SHARED_STATE_DIR')
+shared_state_reader = SharedStateReader(SHARED_STATE_DIR) if SHARED_STATE_DIR else None
+
+# Maximum number of items accepted by the batch topic-to-LO endpoint
+MAX_TOPIC_BATCH = 5000
+
+# Field order of alert change events
+ALERT_EVENT_COLUMNS = ['version', 'type', 'student_id', 'learning_outcome',
+                       'urgency', 'previous_urgency', 'probability']
+
+# Admission pools: (concurrency, queue size, queue timeout in seconds), per worker
+# process. Override with PLP_POOL_<NAME>=concurrency,queue_size,timeout; keep
+# compute + export + write (concurrency + queue) below the worker's thread
+# count so cheap reads always find a free thread.
+ADMISSION_POOL_DEFAULTS = {
+    'read': (32, 64, 1.0),
+    'compute': (2, 2, 2.0),
+    'export': (2, 2, 2.0),
+    'write': (1, 1, 5.0)
+}
+
+# Pool of each endpoint; unlisted endpoints count as compute
+ENDPOINT_POOLS = {
+    'home': 'read',
+    'get_curriculum_mapping': 'read',
+    'list_students': 'read',
+    'similar_students': 'read',
+    'predict_student_achievement': 'read',
+    'get_student_report': 'read',
+    'get_student_recommendations': 'read',
+    'predict_topic_to_lo': 'read',
+    'analyze_class': 'compute',
+    'group_students': 'compute',
+    'predict_topic_to_lo_batch': 'compute',
+    'get_alerts': 'compute',
+    'simulate_scores': 'compute',
+    'export_summary': 'export',
+    'export_scores': 'export',
+    'upload_scores': 'write'
+}
+
+# Never queued or shed, so monitoring keeps working under overload
+ADMISSION_EXEMPT = {'health_check', 'metrics', 'static'}
+
+# Coalesced endpoints: only the single-flight leader takes a slot of the
+# endpoint's pool, so identical requests waiting on its result are not shed
+LEADER_ADMITTED = {'analyze_class', 'group_students'}
+
+def _admission_pool(name, defaults):
+    """Build an admission pool from its defaults and PLP_POOL_<NAME> override"""
+    concurrency, queue_size, queue_timeout = defaults
+    override = os.environ.get(f'PLP_POOL_{name.upper()}')
+    if override:
+        concurrency, queue_size, queue_timeout = override.split(',')
+    return AdmissionPool(name, int(concurrency), int(queue_size), float(queue_timeout))
+
+admission_pools = {
+    name: _admission_pool(name, defaults)
+    for name, defaults in ADMISSION_POOL_DEFAULTS.items()
+}
+
 def initialize_analyzer():
     """Initialize the LOAnalyzer instance"""
     global analyzer
     try:
-        analyzer = LOAnalyzer(csv_path='python/student_scores.csv')
-        analyzer.preprocess_data()
-        analyzer.train_models()
+        new_analyzer = LOAnalyzer(csv_path=DATA_FILE)
+        new_analyzer.preprocess_data()
+        if MODEL_FILE and os.path.exists(MODEL_FILE):
+            new_analyzer.load_models(MODEL_FILE)
+        else:
+            new_analyzer.train_models()
+        analyzer = new_analyzer
         print("✅ LOAnalyzer initialized successfully")
+        publish_shared_state()
         return True
     except Exception as e:
         print(f"❌ Failed to initialize LOAnalyzer: {str(e)}")
         return False
 
+def refresh_analyzer():
+    """
+    Pick up the latest scores file and, when it has changed, MODEL_FILE
+    
+    Otherwise reuses the current models unless the retraining policy asks for
+    a retrain; falls back to a full initialization if there is no analyzer yet.
+    """
+    global analyzer
+    if analyzer is None:
+        return initialize_analyzer()
+    try:
+        model_signature = file_signature(MODEL_FILE) if MODEL_FILE else None
+        new_models = model_signature is not None and model_signature != analyzer.model_signature
+        decision = analyzer.reload_data(model_path=MODEL_FILE if new_models else None)
+        print(f"✅ LOAnalyzer refreshed (data version {decision['data_version']}, "
+              f"model version {decision['model_version']})")
+        publish_shared_state()
+        return True
+    except Exception as e:
+        print(f"❌ Failed to refresh LOAnalyzer: {str(e)}")
+        return False
+
+def publish_shared_state():
+    """Publish the analyzer's predictions for all workers (when PLP_SHARED_STATE_DIR is set)"""
+    if not SHARED_STATE_DIR or analyzer is None:
+        return
+    try:
+        analyzer.publish_shared_state(SHARED_STATE_DIR)
+        # Serve the new version from this worker right away, not after the check interval
+        shared_state_reader.refresh()
+    except Exception as e:
+        # Workers keep serving the previous version (or their own analyzer)
+        print(f"⚠️ Failed to publish shared state: {str(e)}")
+
+def _student_predictions(student_id, learning_outcome=None):
+    """
+    Per-LO predictions of a student, read from the shared state when published
+    
+    Falls back to the worker's own analyzer when there is no shared state or
+    the student is not in the published version. Only the per-student
+    prediction endpoints read the shared state; reports and class analytics
+    use the worker's analyzer, which may lag the newest published version
+    until the worker's next upload or reload.
+    """
+    state = shared_state_reader.current() if shared_state_reader else None
+    rows = state.student_rows(student_id) if state else None
+    if rows is None:
+        return analyzer.predict_student_lo_achievement(student_id, learning_outcome)
+    
+    if learning_outcome:
+        rows = [row for row in rows if row['learning_outcome'] == learning_outcome]
+        if not rows:
+            return {"error": f"No data found for student {student_id} and LO {learning_outcome}"}
+    return analyzer.format_predictions(rows)
+
+def _busy_response(rejection):
+    """429/503 response with Retry-After for a request shed by an admission pool"""
+    response = jsonify({
+        'error': 'Server is busy, please retry later',
+        'pool': rejection.pool,
+        'reason': rejection.reason,
+        'retry_after': rejection.retry_after
+    })
+    response.status_code = rejection.status
+    response.headers['Retry-After'] = str(rejection.retry_after)
+    return response
+
+def _run_admitted(endpoint, func):
+    """
+    Run func holding a slot of the endpoint's pool
+    
+    Used by single-flight leaders of LEADER_ADMITTED endpoints; a Rejected
+    error reaches the leader and every request coalesced onto it.
+    """
+    pool = admission_pools[ENDPOINT_POOLS.get(endpoint, 'compute')]
+    admitted_at = pool.acquire()
+    try:
+        return func()
+    finally:
+        pool.release(admitted_at)
+
+@app.before_request
+def admit_request():
+    """Admit the request to its endpoint's pool, or shed it with 429/503 and Retry-After"""
+    if request.endpoint is None or request.endpoint in ADMISSION_EXEMPT or request.method == 'OPTIONS':
+        return None
+    if request.endpoint in LEADER_ADMITTED:
+        return None
+    
+    pool = admission_pools[ENDPOINT_POOLS.get(request.endpoint, 'compute')]
+    try:
+        g.admission = (pool, pool.acquire())
+    except Rejected as e:
+        return _busy_response(e)
+    return None
+
+@app.teardown_request
+def release_admission(error=None):
+    """Free the request's pool slot"""
+    admission = g.pop('admission', None)
+    if admission is not None:
+        pool, admitted_at = admission
+        pool.release(admitted_at)
+
 @app.route('/')
 def home():
     """API health check endpoint"""
@@ -49,13 +242,20 @@ def home():
         'status': 'running',
         'endpoints': [
             'GET /api/health',
+            'GET /api/metrics',
             'POST /api/predict/student',
             'GET /api/analyze/class',
             'GET /api/groups/students',
             'GET /api/report/student/<student_id>',
             'POST /api/predict/topic-to-lo',
+            'POST /api/predict/topic-to-lo/batch',
             'GET /api/recommendations/<student_id>',
-            'POST /api/upload/scores'
+            'POST /api/upload/scores',
+            'POST /api/simulate',
+            'GET /api/alerts?since=<version>',
+            'GET /api/students/<student_id>/similar?k=10',
+            'GET /api/export/summary',
+            'GET /api/export/scores'
         ]
     })
 
@@ -70,7 +270,7 @@ def health_check():
         'timestamp': datetime.now().isoformat(),
         'system_info': {
             'python_version': sys.version,
-            'data_file_exists': os.path.exists('python/student_scores.csv')
+            'data_file_exists': os.path.exists(DATA_FILE)
         }
     }
     
@@ -78,11 +278,44 @@ def health_check():
         status['data_info'] = {
             'total_records': len(analyzer.data) if analyzer.data is not None else 0,
             'unique_students': analyzer.data['student_id'].nunique() if analyzer.data is not None else 0,
-            'models_trained': len(analyzer.models) > 0
+            'models_trained': len(analyzer.models) > 0,
+            'model_version': analyzer.model_version,
+            'data_version': analyzer.data_version,
+            'materialized_predictions': len(analyzer.predictions) if analyzer.predictions is not None else 0
+        }
+        
+        decision = analyzer.last_retrain_decision
+        status['retraining'] = {
+            'last_decision': decision['reason'] if decision else None,
+            'retrained': decision['retrain'] if decision else None,
+            'triggers': decision['triggers'] if decision else [],
+            'drift': decision['metrics'] if decision else {},
+            'evaluated_at': decision['evaluated_at'] if decision else None
+        }
+    
+    if shared_state_reader:
+        state = shared_state_reader.current()
+        status['shared_state'] = {
+            'directory': SHARED_STATE_DIR,
+            'version': state.version if state else None,
+            'data_version': state.meta['data_version'] if state else None,
+            'model_version': state.meta['model_version'] if state else None,
+            'rows': state.meta['rows'] if state else 0,
+            'published_at': state.meta['published_at'] if state else None
         }
     
     return jsonify(status)
 
+@app.route('/api/metrics')
+def metrics():
+    """Request coalescing and admission counters of this worker process"""
+    return jsonify({
+        'pid': os.getpid(),
+        'single_flight': single_flight.stats(),
+        'admission': {name: pool.stats() for name, pool in admission_pools.items()},
+        'timestamp': datetime.now().isoformat()
+    })
+
 @app.route('/api/predict/student', methods=['POST'])
 def predict_student_achievement():
     """
@@ -108,7 +341,10 @@ def predict_student_achievement():
         student_id = data['student_id']
         learning_outcome = data.get('learning_outcome')
         
-        predictions = analyzer.predict_student_lo_achievement(student_id, learning_outcome)
+        if not isinstance(student_id, int) or isinstance(student_id, bool):
+            return jsonify({'error': 'student_id must be an integer'}), 400
+        
+        predictions = _student_predictions(student_id, learning_outcome)
         
         if 'error' in predictions:
             return jsonify(predictions), 404
@@ -123,23 +359,126 @@ def predict_student_achievement():
     except Exception as e:
         return jsonify({'error': f'Prediction failed: {str(e)}'}), 500
 
+@app.route('/api/simulate', methods=['POST'])
+def simulate_scores():
+    """
+    What-if simulation of future task scores, optionally solving for the required score
+    
+    Expected JSON body:
+    {
+        "student_id": 2,                      (or "student_ids": [2, 3], or "section": "BSIT3B")
+        "course": "Capstone 1",               (optional, narrows a section)
+        "future_scores": {"LO1": [85, 90]},   (hypothetical percentage scores per LO)
+        "remaining_tasks": {"LO4": 2},        (optional, upcoming task counts for solving)
+        "solve": true,                        (optional, find the minimum uniform score needed)
+        "target_probability": 0.6             (optional, ensemble probability to reach)
+    }
+    """
+    global analyzer
+    
+    if not analyzer:
+        return jsonify({'error': 'Analyzer not initialized'}), 500
+    
+    try:
+        data = request.get_json(silent=True)
+        
+        if not isinstance(data, dict):
+            return jsonify({'error': 'JSON object body is required'}), 400
+        
+        if 'student_id' in data:
+            student_ids = [data['student_id']]
+        else:
+            student_ids = data.get('student_ids')
+        section = data.get('section')
+        
+        if student_ids is None and section is None:
+            return jsonify({'error': 'student_id, student_ids or section is required'}), 400
+        if student_ids is not None and (not isinstance(student_ids, list) or
+                                        not all(isinstance(x, int) for x in student_ids)):
+            return jsonify({'error': 'student_ids must be a list of integers'}), 400
+        
+        future_scores = data.get('future_scores') or {}
+        remaining_tasks = data.get('remaining_tasks') or {}
+        if not isinstance(future_scores, dict) or not all(
+                isinstance(scores, list) and all(isinstance(x, (int, float)) for x in scores)
+                for scores in future_scores.values()):
+            return jsonify({'error': 'future_scores must map LOs to lists of scores'}), 400
+        if not isinstance(remaining_tasks, dict) or not all(
+                isinstance(n, int) and n >= 0 for n in remaining_tasks.values()):
+            return jsonify({'error': 'remaining_tasks must map LOs to task counts'}), 400
+        
+        target_probability = data.get('target_probability', AT_RISK_PROBABILITY)
+        if not isinstance(target_probability, (int, float)) or not 0 < target_probability < 1:
+            return jsonify({'error': 'target_probability must be between 0 and 1'}), 400
+        
+        try:
+            results = analyzer.simulate_scores(
+                student_ids=student_ids,
+                section=section,
+                course=data.get('course'),
+                future_scores=future_scores,
+                remaining_tasks=remaining_tasks,
+                solve=bool(data.get('solve', False)),
+                target_probability=target_probability
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return json_response({
+            'success': True,
+            'model_version': analyzer.model_version,
+            'target_probability': target_probability,
+            'count': len(results),
+            'results': frame_to_records(results),
+            'generated_at': datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({'error': f'Simulation failed: {str(e)}'}), 500
+
 @app.route('/api/analyze/class')
 def analyze_class():
-    """Get comprehensive class performance analysis"""
+    """
+    Get comprehensive class performance analysis
+    
+    Query parameters (all optional):
+        course, subject, learning_outcome: Exact-match filters
+        date_from, date_to: Submission date range, YYYY-MM-DD (week granularity)
+    """
     global analyzer
     
     if not analyzer:
         return jsonify({'error': 'Analyzer not initialized'}), 500
     
     try:
-        analysis = analyzer.analyze_class_performance()
+        filters = {
+            name: request.args.get(name)
+            for name in ('course', 'subject', 'learning_outcome', 'date_from', 'date_to')
+        }
         
-        return jsonify({
+        for name in ('date_from', 'date_to'):
+            if filters[name] is not None:
+                try:
+                    datetime.strptime(filters[name], '%Y-%m-%d')
+                except ValueError:
+                    return jsonify({'error': f'{name} must be a date in YYYY-MM-DD format'}), 400
+        
+        etag = version_etag(analyzer, request.query_string.decode('utf-8'))
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        # The ETag already identifies the filters and data/model version
+        payload = single_flight.do('analyze_class', etag, lambda: _run_admitted('analyze_class', lambda: {
             'success': True,
-            'analysis': analysis,
+            'analysis': analyzer.analyze_class_performance(**filters),
             'generated_at': datetime.now().isoformat()
-        })
+        }))
+        
+        return json_response(payload, etag=etag)
         
+    except Rejected as e:
+        return _busy_response(e)
     except Exception as e:
         return jsonify({'error': f'Analysis failed: {str(e)}'}), 500
 
@@ -158,15 +497,22 @@ def group_students():
         if n_clusters < 2 or n_clusters > 10:
             return jsonify({'error': 'Number of clusters must be between 2 and 10'}), 400
         
-        groups = analyzer.group_students_by_performance(n_clusters)
+        etag = version_etag(analyzer, n_clusters)
+        cached = not_modified(etag)
+        if cached:
+            return cached
         
-        return jsonify({
+        payload = single_flight.do('group_students', etag, lambda: _run_admitted('group_students', lambda: {
             'success': True,
-            'groups': groups,
+            'groups': analyzer.group_students_by_performance(n_clusters),
             'cluster_count': n_clusters,
             'generated_at': datetime.now().isoformat()
-        })
+        }))
+        
+        return json_response(payload, etag=etag)
         
+    except Rejected as e:
+        return _busy_response(e)
     except Exception as e:
         return jsonify({'error': f'Grouping failed: {str(e)}'}), 500
 
@@ -179,12 +525,17 @@ def get_student_report(student_id):
         return jsonify({'error': 'Analyzer not initialized'}), 500
     
     try:
+        etag = version_etag(analyzer, student_id)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
         report = analyzer.generate_student_report(student_id)
         
-        return jsonify({
+        return json_response({
             'success': True,
             'report': report
-        })
+        }, etag=etag)
         
     except Exception as e:
         return jsonify({'error': f'Report generation failed: {str(e)}'}), 500
@@ -241,6 +592,79 @@ def predict_topic_to_lo():
     except Exception as e:
         return jsonify({'error': f'LO prediction failed: {str(e)}'}), 500
 
+@app.route('/api/predict/topic-to-lo/batch', methods=['POST'])
+def predict_topic_to_lo_batch():
+    """
+    Predict Learning Outcomes for many task titles/topics in one request
+    Useful when importing a whole course's coursework at once
+    
+    Expected JSON body:
+    {
+        "items": [
+            {"task_title": "Research Methodology Assignment", "topic": "Literature Review"},
+            {"task_title": "System Design Project"}
+        ]
+    }
+    """
+    global analyzer
+    
+    if not analyzer:
+        return jsonify({'error': 'Analyzer not initialized'}), 500
+    
+    try:
+        data = request.get_json()
+        
+        if not data or not isinstance(data.get('items'), list):
+            return jsonify({'error': 'items array is required'}), 400
+        
+        items = data['items']
+        
+        if len(items) > MAX_TOPIC_BATCH:
+            return jsonify({'error': f'At most {MAX_TOPIC_BATCH} items per batch'}), 400
+        
+        invalid = [i for i, item in enumerate(items)
+                   if not isinstance(item, dict) or 'task_title' not in item]
+        if invalid:
+            return jsonify({'error': 'task_title is required for every item', 'invalid_items': invalid}), 400
+        
+        rankings = analyzer.rank_los_for_topics(
+            [(item['task_title'], item.get('topic')) for item in items]
+        )
+        
+        results = []
+        predicted = set()
+        for item, ranking in zip(items, rankings):
+            predicted.update(ranking['predicted_los'])
+            results.append({
+                'input': {
+                    'task_title': item['task_title'],
+                    'topic': item.get('topic')
+                },
+                'predicted_los': ranking['predicted_los'],
+                'ranked_los': [{'learning_outcome': lo, 'score': score} for lo, score in ranking['ranked']],
+                'confidence': 'high' if len(ranking['predicted_los']) == 1 else 'medium'
+            })
+        
+        # LO details are listed once for the whole batch
+        lo_details = {
+            lo: {
+                'description': analyzer.curriculum_mapping[lo]['description'],
+                'related_topics': analyzer.curriculum_mapping[lo]['topics']
+            }
+            for lo in analyzer.curriculum_mapping if lo in predicted
+        }
+        
+        return json_response({
+            'success': True,
+            'results': results,
+            'count': len(results),
+            'lo_details': lo_details,
+            'generated_at': datetime.now().isoformat()
+        })
+        
+    except Exception as e:
+        return jsonify({'error': f'Batch LO prediction failed: {str(e)}'}), 500
+
 @app.route('/api/recommendations/<int:student_id>')
 def get_student_recommendations(student_id):
     """Get personalized recommendations for a student"""
@@ -251,7 +675,7 @@ def get_student_recommendations(student_id):
     
     try:
         # Get predictions first
-        predictions = analyzer.predict_student_lo_achievement(student_id)
+        predictions = _student_predictions(student_id)
         
         if 'error' in predictions:
             return jsonify(predictions), 404
@@ -272,7 +696,7 @@ def get_student_recommendations(student_id):
             if data['ensemble_probability'] < 0.6:
                 priority_areas.append({
                     'learning_outcome': lo,
-                    'description': analyzer.curriculum_mapping[lo]['description'],
+                    'description': analyzer.lo_description(lo),
                     'probability': data['ensemble_probability'],
                     'urgency': 'high' if data['ensemble_probability'] < 0.4 else 'medium'
                 })
@@ -289,13 +713,57 @@ def get_student_recommendations(student_id):
     except Exception as e:
         return jsonify({'error': f'Recommendations failed: {str(e)}'}), 500
 
+@app.route('/api/alerts')
+def get_alerts():
+    """
+    Get at-risk alert changes since a given alert version
+    
+    Query parameters:
+        since: Alert version from the previous poll (omit for the full current list)
+        stream: Alert stream from the previous poll; versions are per worker process,
+                so a version from another stream returns the full list (reset)
+    
+    Events are newly_at_risk, recovered or urgency_changed (ensemble probability
+    below 60% is at risk, below 40% is high urgency).
+    """
+    global analyzer
+    
+    if not analyzer:
+        return jsonify({'error': 'Analyzer not initialized'}), 500
+    
+    try:
+        since = request.args.get('since', type=int)
+        stream = request.args.get('stream')
+        
+        changes = analyzer.get_alert_changes(since, stream)
+        events = changes['events']
+        
+        return json_response({
+            'success': True,
+            'stream': changes['stream'],
+            'version': changes['version'],
+            'since': changes['since'],
+            'reset': changes['reset'],
+            'at_risk_count': changes['at_risk_count'],
+            'events': frame_to_records(events, ALERT_EVENT_COLUMNS) if events is not None else [],
+            'generated_at': changes['generated_at']
+        })
+        
+    except Exception as e:
+        return jsonify({'error': f'Alerts failed: {str(e)}'}), 500
+
 @app.route('/api/upload/scores', methods=['POST'])
 def upload_scores():
     """
-    Upload new student scores and retrain models
+    Upload student scores and retrain models when the data has drifted
+    
+    Records are upserted on (student_id, task_id): re-sending an unchanged
+    record is a no-op and a changed record replaces the stored one.
+    course, subject, task_id, date_submitted and topic are optional.
     
     Expected JSON body:
     {
+        "force_retrain": false (optional),
         "scores": [
             {
                 "student_id": 11,
@@ -326,43 +794,48 @@ def upload_scores():
         
         new_scores = data['scores']
         
-        # Validate required fields
-        required_fields = ['student_id', 'student_name', 'task_title', 'score', 
-                          'total_score', 'learning_outcomes']
-        
-        for score in new_scores:
-            missing_fields = [field for field in required_fields if field not in score]
-            if missing_fields:
-                return jsonify({
-                    'error': f'Missing required fields: {missing_fields}'
-                }), 400
-        
-        # Create new DataFrame and append to existing data
-        new_df = pd.DataFrame(new_scores)
-        
-        # Fill missing optional fields
-        new_df['course'] = new_df.get('course', 'Unknown Course')
-        new_df['subject'] = new_df.get('subject', 'Unknown Subject')
-        new_df['task_id'] = new_df.get('task_id', range(1000, 1000 + len(new_df)))
-        new_df['date_submitted'] = new_df.get('date_submitted', datetime.now().strftime('%Y-%m-%d'))
-        new_df['topic'] = new_df.get('topic', 'Unknown Topic')
-        
-        # Append to existing data
-        analyzer.data = pd.concat([analyzer.data, new_df], ignore_index=True)
+        if not isinstance(new_scores, list):
+            return jsonify({'error': 'scores must be an array'}), 400
         
-        # Reprocess and retrain
-        analyzer.preprocess_data()
-        analyzer.train_models()
+        # Other workers (and lo_cli ingest) write the same file; hold the lock
+        # across the whole read-merge-write so no upload overwrites another
+        with data_file_lock(DATA_FILE):
+            if analyzer.data_file_changed():
+                print("🔄 Scores file changed in another process, merging into its latest version")
+                analyzer.reload_data()
+            
+            # Upsert on (student_id, task_id); invalid rows are reported, not applied
+            decision = analyzer.ingest_scores(
+                pd.DataFrame(new_scores),
+                force_retrain=bool(data.get('force_retrain', False))
+            )
+            batch = decision['batch']
+            
+            # Save updated data (only if something changed)
+            if batch['inserted'] or batch['updated']:
+                analyzer.save_data(DATA_FILE)
+                publish_shared_state()
         
-        # Save updated data
-        analyzer.data.to_csv('python/student_scores.csv', index=False)
+        if batch['rejected'] and batch['rejected'] == batch['received']:
+            return jsonify({
+                'error': 'No valid score records in batch',
+                'batch': batch
+            }), 400
         
         return jsonify({
             'success': True,
-            'message': f'Successfully uploaded {len(new_scores)} new score records',
+            'message': (f"Processed {batch['received']} score records: {batch['inserted']} inserted, "
+                        f"{batch['updated']} updated, {batch['unchanged']} unchanged, {batch['rejected']} rejected"),
+            'batch': batch,
             'total_records': len(analyzer.data),
             'unique_students': analyzer.data['student_id'].nunique(),
-            'models_retrained': True,
+            'models_retrained': decision['retrain'],
+            'retraining': {
+                'reason': decision['reason'],
+                'triggers': decision['triggers'],
+                'model_version': decision['model_version'],
+                'data_version': decision['data_version']
+            },
             'updated_at': datetime.now().isoformat()
         })
         
@@ -385,34 +858,185 @@ def get_curriculum_mapping():
 
 @app.route('/api/students/list')
 def list_students():
-    """Get list of all students in the system"""
+    """
+    Get a page of the students in the system
+    
+    Query parameters (all optional):
+        course, subject: Exact-match filters
+        min_avg, max_avg: Average percentage range
+        min_tasks, max_tasks: Task count range
+        sort: student_id | student_name | avg_percentage | total_tasks (default: student_id)
+        order: asc | desc (default: asc)
+        limit: Page size, 1-1000 (default: 100)
+        cursor: next_cursor from the previous page
+    """
     global analyzer
     
     if not analyzer:
         return jsonify({'error': 'Analyzer not initialized'}), 500
     
     try:
-        students = analyzer.data.groupby('student_id').agg({
-            'student_name': 'first',
-            'course': 'first',
-            'subject': 'first',
-            'score': 'count',  # Total number of tasks
-            'percentage_score': 'mean'  # Average percentage
-        }).reset_index()
+        limit = request.args.get('limit', 100, type=int)
         
-        students.columns = ['student_id', 'student_name', 'course', 'subject', 'total_tasks', 'avg_percentage']
-        students['avg_percentage'] = students['avg_percentage'].round(2)
+        if limit < 1 or limit > 1000:
+            return jsonify({'error': 'limit must be between 1 and 1000'}), 400
         
-        return jsonify({
+        etag = version_etag(analyzer, request.query_string.decode('utf-8'))
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        try:
+            result = analyzer.query_roster(
+                course=request.args.get('course'),
+                subject=request.args.get('subject'),
+                min_avg=request.args.get('min_avg', type=float),
+                max_avg=request.args.get('max_avg', type=float),
+                min_tasks=request.args.get('min_tasks', type=int),
+                max_tasks=request.args.get('max_tasks', type=int),
+                sort_by=request.args.get('sort', 'student_id'),
+                order=request.args.get('order', 'asc'),
+                cursor=request.args.get('cursor'),
+                limit=limit
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        return json_response({
             'success': True,
-            'students': students.to_dict('records'),
-            'total_count': len(students),
+            'students': frame_to_records(result['students']),
+            'count': len(result['students']),
+            'total_count': result['total_count'],
+            'next_cursor': result['next_cursor'],
             'generated_at': datetime.now().isoformat()
-        })
+        }, etag=etag)
         
     except Exception as e:
         return jsonify({'error': f'Failed to list students: {str(e)}'}), 500
 
+@app.route('/api/students/<int:student_id>/similar')
+def similar_students(student_id):
+    """
+    Get the students whose per-LO performance is closest to a student's
+    
+    Query parameters:
+        k: Number of peers, 1-100 (default: 10)
+    """
+    global analyzer
+    
+    if not analyzer:
+        return jsonify({'error': 'Analyzer not initialized'}), 500
+    
+    try:
+        k = request.args.get('k', 10, type=int)
+        
+        if k < 1 or k > MAX_NEIGHBORS:
+            return jsonify({'error': f'k must be between 1 and {MAX_NEIGHBORS}'}), 400
+        
+        etag = version_etag(analyzer, 'similar', student_id, k)
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        result = analyzer.similar_students(student_id, k)
+        
+        if 'error' in result:
+            return jsonify(result), 404
+        
+        return json_response({
+            'success': True,
+            'student_id': student_id,
+            'k': k,
+            'learning_outcomes': result['learning_outcomes'],
+            'neighbors': frame_to_records(result['neighbors']),
+            'generated_at': datetime.now().isoformat()
+        }, etag=etag)
+        
+    except Exception as e:
+        return jsonify({'error': f'Similar students lookup failed: {str(e)}'}), 500
+
+def _arrow_export(table_name):
+    """Stream a filtered, projected analyzer table as Arrow IPC record batches"""
+    global analyzer
+    
+    if not analyzer:
+        return jsonify({'error': 'Analyzer not initialized'}), 500
+    
+    if not arrow_export.available():
+        return jsonify({'error': 'Arrow export requires pyarrow (pip install pyarrow)'}), 501
+    
+    try:
+        batch_rows = request.args.get('batch_rows', arrow_export.DEFAULT_BATCH_ROWS, type=int)
+        if batch_rows < 1 or batch_rows > arrow_export.MAX_BATCH_ROWS:
+            return jsonify({'error': f'batch_rows must be between 1 and {arrow_export.MAX_BATCH_ROWS}'}), 400
+        
+        for name in ('date_from', 'date_to'):
+            if request.args.get(name) is not None:
+                try:
+                    datetime.strptime(request.args[name], '%Y-%m-%d')
+                except ValueError:
+                    return jsonify({'error': f'{name} must be a date in YYYY-MM-DD format'}), 400
+        
+        etag = version_etag(analyzer, 'arrow', table_name, request.query_string.decode('utf-8'))
+        cached = not_modified(etag)
+        if cached:
+            return cached
+        
+        columns = request.args.get('columns')
+        filters = {
+            column: request.args[column].split(',')
+            for column in arrow_export.FILTER_COLUMNS if request.args.get(column)
+        }
+        
+        try:
+            table = arrow_exporter.prepare(
+                analyzer, table_name,
+                columns=columns.split(',') if columns else None,
+                filters=filters,
+                date_from=request.args.get('date_from'),
+                date_to=request.args.get('date_to')
+            )
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        response = Response(stream_with_context(arrow_exporter.stream(table, batch_rows)),
+                            mimetype=arrow_export.ARROW_STREAM_MIMETYPE)
+        response.headers['ETag'] = f'"{etag}"'
+        response.headers['X-Row-Count'] = str(table.num_rows)
+        return response
+        
+    except Exception as e:
+        return jsonify({'error': f'Export failed: {str(e)}'}), 500
+
+@app.route('/api/export/summary')
+def export_summary():
+    """
+    Stream the student-LO summary (or the roster) as an Arrow IPC stream
+    
+    Query parameters (all optional):
+        table: summary | roster (default: summary)
+        columns: Comma-separated columns to include, in order
+        student_id, course, subject, learning_outcome: Filters (comma-separated values)
+        batch_rows: Rows per record batch (default: 65536)
+    """
+    table_name = request.args.get('table', 'summary')
+    if table_name not in ('summary', 'roster'):
+        return jsonify({'error': 'table must be summary or roster'}), 400
+    return _arrow_export(table_name)
+
+@app.route('/api/export/scores')
+def export_scores():
+    """
+    Stream the raw score records (with percentage_score) as an Arrow IPC stream
+    
+    Query parameters (all optional):
+        columns: Comma-separated columns to include, in order
+        student_id, task_id, course, subject: Filters (comma-separated values)
+        date_from, date_to: Submission date range, YYYY-MM-DD
+        batch_rows: Rows per record batch (default: 65536)
+    """
+    return _arrow_export('scores')
+
 # Error handlers
 @app.errorhandler(404)
 def not_found(error):
@@ -435,28 +1059,36 @@ def startup():
     else:
         print("✅ API fully initialized and ready!")
 
+# The dev server's reloader runs this module twice: a watcher process that
+# never serves requests, and the serving child (WERKZEUG_RUN_MAIN=true).
+# Only build the analyzer where requests are actually served.
+DEBUG = os.environ.get('FLASK_DEBUG', '1') == '1'
+RELOADER_WATCHER = __name__ == '__main__' and DEBUG and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+
 # Register startup function to run with the app context
-with app.app_context():
-    startup()
+if not RELOADER_WATCHER:
+    with app.app_context():
+        startup()
 
 if __name__ == '__main__':
     print("🎓 PLP Academic Management System - Flask API")
     print("=" * 50)
+    print("ℹ️ Development server. For production use:")
+    print("   gunicorn -c python/gunicorn.conf.py flask_api:app")
     
     # Check if data file exists
-    if not os.path.exists('python/student_scores.csv'):
-        print("❌ python/student_scores.csv not found!")
+    if not os.path.exists(DATA_FILE):
+        print(f"❌ {DATA_FILE} not found!")
         print("   Please ensure the data file is in the same directory as this script.")
         sys.exit(1)
     
-    # Initialize analyzer
-    if initialize_analyzer():
+    if RELOADER_WATCHER or analyzer is not None:
         print("🌐 Starting Flask server...")
         app.run(
             host='0.0.0.0',  # Allow external connections
             port=5000,
-            debug=True
+            debug=DEBUG
         )
     else:
         print("❌ Failed to start API due to analyzer initialization error")
-        sys.exit(1) 
\ No newline at end of file
+        sys.exit(1)
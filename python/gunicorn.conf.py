@@ -0,0 +1,113 @@
+"""
+Gunicorn Configuration for the LO Analysis API
+==============================================
+
+Production launch mode for flask_api.py. Run from the repository root:
+
+    gunicorn -c python/gunicorn.conf.py flask_api:app
+
+The app is preloaded, so the LOAnalyzer (data, preprocessing and trained
+models) is built once in the master process and shared copy-on-write with
+every forked worker. When the model file (PLP_MODEL_FILE) or the reload
+marker file changes, the master re-reads the scores CSV, loads the new
+models and gracefully replaces its workers (the same happens on a manual
+``kill -HUP <master pid>``). Uploads do not trigger a reload: workers merge
+them through the locked scores file themselves.
+
+Environment variables:
+    PLP_API_BIND            Address to listen on (default: 0.0.0.0:5000)
+    PLP_API_WORKERS         Number of worker processes (default: CPU count)
+    PLP_API_THREADS         Threads per worker (default: 12; keep above the compute, export
+                            and write admission pools' concurrency + queue, see flask_api.py)
+    PLP_API_TIMEOUT         Worker timeout in seconds (default: 120)
+    PLP_RELOAD_MARKER       File whose modification triggers a reload (optional)
+    PLP_RELOAD_POLL_SECONDS How often the model and marker files are checked (default: 5)
+    PLP_SHARED_STATE_DIR    Directory of the memory-mapped prediction state; the master
+                            publishes a new version after every (re)build (optional)
+
+Author: PLP Academic Management System
+Version: 1.0
+Purpose: Capstone Project - Smart Academic Management System
+"""
+
+import gc
+import multiprocessing
+import os
+import signal
+import threading
+import time
+
+# flask_api and lo_analyzer live next to this file
+pythonpath = os.path.dirname(os.path.abspath(__file__))
+
+bind = os.environ.get('PLP_API_BIND', '0.0.0.0:5000')
+workers = int(os.environ.get('PLP_API_WORKERS', multiprocessing.cpu_count()))
+threads = int(os.environ.get('PLP_API_THREADS', 12))
+worker_class = 'gthread'
+timeout = int(os.environ.get('PLP_API_TIMEOUT', 120))
+graceful_timeout = 30
+keepalive = 5
+
+# Build the analyzer once in the master and share it with forked workers
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+loglevel = 'info'
+
+RELOAD_POLL_SECONDS = float(os.environ.get('PLP_RELOAD_POLL_SECONDS', 5))
+
+
+def _watched_files():
+    """Files whose modification means a new model version (or a requested reload)"""
+    import flask_api
+
+    files = [flask_api.MODEL_FILE] if flask_api.MODEL_FILE else []
+    marker = os.environ.get('PLP_RELOAD_MARKER')
+    if marker:
+        files.append(marker)
+    return files
+
+
+def _signature(paths):
+    """Modification times of the watched files (None for missing files)"""
+    return tuple(os.path.getmtime(path) if os.path.exists(path) else None for path in paths)
+
+
+def _watch_for_new_version(server):
+    """Poll the watched files and ask the master for a graceful reload on change"""
+    paths = _watched_files()
+    last_seen = _signature(paths)
+
+    while True:
+        time.sleep(RELOAD_POLL_SECONDS)
+        current = _signature(paths)
+        if current != last_seen:
+            last_seen = current
+            server.log.info("🔁 New model version or reload marker detected, reloading workers")
+            os.kill(server.pid, signal.SIGHUP)
+
+
+def when_ready(server):
+    """Start the version watcher once the master is listening"""
+    # Objects created so far live for the whole process; keep the collector
+    # from touching (and so copying) their pages in every worker
+    gc.freeze()
+
+    if not _watched_files():
+        return
+    watcher = threading.Thread(target=_watch_for_new_version, args=(server,), daemon=True)
+    watcher.start()
+
+
+def on_reload(server):
+    """Rebuild the shared analyzer in the master before new workers are forked"""
+    import flask_api
+
+    server.log.info("🔄 Rebuilding analyzer in master process")
+    gc.unfreeze()
+    if flask_api.refresh_analyzer():
+        server.log.info("✅ Analyzer rebuilt, forking fresh workers")
+    else:
+        server.log.warning("⚠️ Analyzer rebuild failed, workers keep the previous state")
+    gc.freeze()
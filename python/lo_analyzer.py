@@ -12,18 +12,110 @@ Purpose: Capstone Project - Smart Academic Management System
 
 import pandas as pd
 import numpy as np
+from scipy import sparse
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
 from sklearn.linear_model import LogisticRegression
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.metrics import classification_report, accuracy_score, confusion_matrix
 from sklearn.cluster import KMeans
+import joblib
 import json
+import base64
+import functools
+import os
 import re
+import tempfile
+import threading
+import uuid
+import zlib
+from contextlib import contextmanager
 from datetime import datetime, timedelta
+from collections import OrderedDict
 import warnings
 warnings.filterwarnings('ignore')
 
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+from retraining_policy import RetrainingPolicy
+from rollup import RollupCube
+from alerts import AlertTracker, AT_RISK_PROBABILITY
+from sketches import TDigest
+from neighbors import StudentSimilarityIndex
+import shared_state
+from serialization import frame_to_records, to_builtin
+
+# Roster columns that can be used to sort the student list
+ROSTER_SORT_COLUMNS = ('student_id', 'student_name', 'avg_percentage', 'total_tasks')
+
+# Maximum number of memoized topic-to-LO texts
+TOPIC_CACHE_SIZE = 4096
+
+# Raw score record schema (columns of student_scores.csv)
+SCORE_COLUMNS = ['student_id', 'student_name', 'course', 'subject', 'task_id', 'task_title',
+                 'score', 'total_score', 'date_submitted', 'learning_outcomes', 'topic']
+REQUIRED_SCORE_FIELDS = ['student_id', 'student_name', 'task_title', 'score',
+                         'total_score', 'learning_outcomes']
+OPTIONAL_SCORE_DEFAULTS = {
+    'course': 'Unknown Course',
+    'subject': 'Unknown Subject',
+    'topic': 'Unknown Topic'
+}
+
+# Task IDs derived from task titles start here to stay clear of real IDs
+DERIVED_TASK_ID_BASE = 1_000_000
+
+# Uniform future scores tried when solving for the minimum required score
+SIMULATION_SCORE_GRID = np.arange(0, 101, dtype=float)
+
+# Upper bound on (student, LO, scenario) rows scored by one simulation
+MAX_SIMULATION_ROWS = 500_000
+
+
+def file_signature(path):
+    """(modification time, size) of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _exclusive(method):
+    """Run an LOAnalyzer method under the analyzer's write lock"""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._write_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
+@contextmanager
+def data_file_lock(path):
+    """
+    Exclusive cross-process lock for a read-modify-write of a scores file
+    
+    Held on '<path>.lock', so API workers and batch jobs updating the same
+    CSV take turns instead of overwriting each other's records. A no-op
+    where fcntl is unavailable (Windows).
+    
+    Args:
+        path (str): Scores CSV
+    """
+    if fcntl is None:
+        yield
+        return
+    with open(f'{path}.lock', 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
 class LOAnalyzer:
     """
     Main class for Learning Outcomes Analysis and Prediction
@@ -37,21 +129,72 @@ class LOAnalyzer:
     - Group students based on performance patterns
     """
     
-    def __init__(self, csv_path='python/student_scores.csv', achievement_threshold=70):
+    def __init__(self, csv_path='python/student_scores.csv', achievement_threshold=70,
+                 retraining_policy=None):
         """
         Initialize the LOAnalyzer
         
         Args:
             csv_path (str): Path to the student scores CSV file
             achievement_threshold (float): Minimum percentage for LO achievement (default: 70%)
+            retraining_policy (RetrainingPolicy, optional): Policy deciding when new data requires retraining
         """
         self.csv_path = csv_path
         self.achievement_threshold = achievement_threshold
         self.data = None
         self.processed_data = None
+        self.student_lo_summary = None
+        self.roster = None
+        self.roster_sort_orders = {}
+        self.rollup = RollupCube()
+        
+        # Streaming quantile sketches of percentage scores per LO and per course
+        self.score_sketches = {'learning_outcome': {}, 'course': {}}
+        
+        # Student x LO performance vectors for similar-student queries
+        self.similarity = StudentSimilarityIndex()
+        
+        # (student_id, task_id) -> row label in self.data, for upserts
+        self._score_index = {}
+        
+        # student_id -> row positions in self.data (built lazily)
+        self._student_positions = None
+        # Sorted per-LO and per-course student averages for percentile ranks (built lazily)
+        self._peer_averages = None
         self.models = {}
         self.scalers = {}
         self.label_encoders = {}
+        # (LO encoder, scaler, random forest, logistic regression), swapped as one
+        # so a scoring thread never mixes a new scaler with an old model
+        self._fitted = None
+        
+        # Serializes everything that changes data, models or predictions (ingest,
+        # reload, training, re-scoring); readers never mutate without it
+        self._write_lock = threading.RLock()
+        
+        # Versioning and drift-triggered retraining
+        self.data_version = 0
+        self.model_version = 0
+        # Random identity of the data/model state; versions are per-process
+        # counters, so processes that diverged never share a tag
+        self.state_tag = uuid.uuid4().hex[:12]
+        # Signature of the scores CSV this analyzer's data matches (None after unsaved changes)
+        self.data_signature = None
+        # Signature of the model file the current models came from (None if trained here)
+        self.model_signature = None
+        self.retraining_policy = retraining_policy or RetrainingPolicy()
+        self.training_baseline = None
+        self.last_retrain_decision = None
+        
+        # Materialized per-(student, LO) predictions for the current model version
+        self.predictions = None
+        self._dirty_students = set()
+        self.alerts = AlertTracker()
+        
+        # Topic-to-LO index over the curriculum vocabulary (built lazily)
+        self._topic_index = None
+        self._topic_cache = OrderedDict()
+        self._topic_lock = threading.Lock()
         
         # Predefined curriculum mapping for late submissions
         self.curriculum_mapping = {
@@ -100,7 +243,9 @@ class LOAnalyzer:
     def load_data(self):
         """Load and perform initial data validation"""
         try:
+            signature = file_signature(self.csv_path)
             self.data = pd.read_csv(self.csv_path)
+            self.data_signature = signature
             print(f"✅ Successfully loaded {len(self.data)} records from {self.csv_path}")
             
             # Validate required columns
@@ -129,36 +274,70 @@ class LOAnalyzer:
         """
         print("🔄 Preprocessing data...")
         
+        self.data = self._prepare_scores(self.data)
+        self._build_score_index()
+        self._student_positions = None
+        self._peer_averages = None
+        
+        # Expand learning outcomes (handle multiple LOs per task)
+        self.processed_data = self._expand_learning_outcomes(self.data)
+        
+        # Calculate student-level aggregations
+        self.student_lo_summary = self._summarize_student_los(self.processed_data)
+        
+        self._build_roster()
+        self.similarity.build(self.student_lo_summary)
+        
+        self.rollup = RollupCube()
+        self.rollup.add(self.processed_data)
+        
+        self.score_sketches = {'learning_outcome': {}, 'course': {}}
+        self._update_sketches(self.processed_data, self.data)
+        
+        print(f"✅ Preprocessing complete. Expanded to {len(self.processed_data)} LO-specific records")
+        print(f"📈 Achievement rate: {self.processed_data['achieved'].mean():.2%}")
+    
+    def _prepare_scores(self, scores):
+        """Add percentage scores and parse submission dates of raw score records"""
+        scores = scores.copy()
+        
         # Calculate percentage scores
-        self.data['percentage_score'] = (self.data['score'] / self.data['total_score']) * 100
+        scores['percentage_score'] = (scores['score'] / scores['total_score']) * 100
         
         # Convert date strings to datetime
-        self.data['date_submitted'] = pd.to_datetime(self.data['date_submitted'])
+        scores['date_submitted'] = pd.to_datetime(scores['date_submitted'])
         
-        # Expand learning outcomes (handle multiple LOs per task)
-        expanded_rows = []
+        return scores
+    
+    def _expand_learning_outcomes(self, scores):
+        """
+        Expand prepared score records into one record per Learning Outcome
         
-        for _, row in self.data.iterrows():
-            los = str(row['learning_outcomes']).split(';')
-            for lo in los:
-                lo = lo.strip()
-                if lo and lo != 'nan':
-                    new_row = row.copy()
-                    new_row['learning_outcome'] = lo
-                    new_row['achieved'] = 1 if row['percentage_score'] >= self.achievement_threshold else 0
-                    expanded_rows.append(new_row)
+        A task mapped to "LO1;LO3" becomes two records that keep the original
+        row's index label.
+        """
+        learning_outcomes = scores['learning_outcomes'].astype(str).str.split(';')
+        expanded = scores.assign(learning_outcome=learning_outcomes).explode('learning_outcome')
+        expanded['learning_outcome'] = expanded['learning_outcome'].str.strip()
+        expanded = expanded[
+            (expanded['learning_outcome'] != '') & (expanded['learning_outcome'] != 'nan')
+        ].copy()
         
-        self.processed_data = pd.DataFrame(expanded_rows)
+        expanded['achieved'] = (expanded['percentage_score'] >= self.achievement_threshold).astype(int)
         
         # Feature engineering
-        self.processed_data['score_category'] = pd.cut(
-            self.processed_data['percentage_score'], 
+        expanded['score_category'] = pd.cut(
+            expanded['percentage_score'], 
             bins=[0, 60, 70, 80, 90, 100], 
             labels=['Failing', 'Below Average', 'Average', 'Good', 'Excellent']
         )
         
-        # Calculate student-level aggregations
-        student_stats = self.processed_data.groupby(['student_id', 'learning_outcome']).agg({
+        return expanded
+    
+    @staticmethod
+    def _summarize_student_los(processed):
+        """Per-(student, LO) features the models are trained on"""
+        student_stats = processed.groupby(['student_id', 'learning_outcome']).agg({
             'percentage_score': ['mean', 'std', 'count'],
             'achieved': 'mean'
         }).reset_index()
@@ -166,11 +345,475 @@ class LOAnalyzer:
         student_stats.columns = ['student_id', 'learning_outcome', 'avg_score', 'score_std', 'task_count', 'achievement_rate']
         student_stats['score_std'] = student_stats['score_std'].fillna(0)
         
-        self.student_lo_summary = student_stats
+        return student_stats
+    
+    def _build_score_index(self):
+        """Index every raw score record by (student_id, task_id); later records win"""
+        keys = zip(self.data['student_id'].tolist(), self.data['task_id'].tolist())
+        self._score_index = dict(zip(keys, self.data.index.tolist()))
+    
+    def _student_scores(self, student_id):
+        """A student's raw score records, without scanning the whole table"""
+        if self._student_positions is None:
+            self._student_positions = self.data.groupby('student_id', sort=False).indices
+        positions = self._student_positions.get(student_id, np.empty(0, dtype=np.intp))
+        return self.data.iloc[positions]
+    
+    @staticmethod
+    def _student_slice(frame, student_id):
+        """Rows of a table sorted by student_id that belong to one student"""
+        student_ids = frame['student_id'].to_numpy()
+        start = np.searchsorted(student_ids, student_id, side='left')
+        stop = np.searchsorted(student_ids, student_id, side='right')
+        return frame.iloc[start:stop]
+    
+    def validate_scores(self, scores):
+        """
+        Validate and normalize a batch of raw score records column by column
         
-        print(f"✅ Preprocessing complete. Expanded to {len(self.processed_data)} LO-specific records")
-        print(f"📈 Achievement rate: {self.processed_data['achieved'].mean():.2%}")
+        Missing optional fields (course, subject, topic, date_submitted) are
+        left empty for ingest_scores to fill; missing task IDs are derived from
+        the task title (reusing the ID of a known task with the same title) so
+        that re-sending the same record always maps to the same key.
+        
+        Args:
+            scores (pd.DataFrame): Raw score records
+            
+        Returns:
+            tuple: (valid records with SCORE_COLUMNS, list of {'row', 'errors'} for rejected rows)
+        """
+        scores = scores.reset_index(drop=True)
+        n = len(scores)
+        problems = [[] for _ in range(n)]
+        
+        def flag(mask, message):
+            for row in np.flatnonzero(mask):
+                problems[row].append(message)
+        
+        def column(name):
+            return scores[name] if name in scores.columns else pd.Series([None] * n, dtype=object)
+        
+        for field in REQUIRED_SCORE_FIELDS:
+            flag(column(field).isna().to_numpy(), f"missing {field}")
+        
+        student_id = pd.to_numeric(column('student_id'), errors='coerce')
+        flag((column('student_id').notna() & (student_id.isna() | (student_id % 1 != 0))).to_numpy(),
+             "student_id must be an integer")
+        
+        score = pd.to_numeric(column('score'), errors='coerce')
+        total_score = pd.to_numeric(column('total_score'), errors='coerce')
+        flag((column('score').notna() & (score.isna() | (score < 0))).to_numpy(),
+             "score must be a non-negative number")
+        flag((column('total_score').notna() & (total_score.isna() | (total_score <= 0))).to_numpy(),
+             "total_score must be a positive number")
+        
+        # At least one ';'-separated token must be non-blank ("LO1;;" is fine, ";;" is not)
+        has_lo = column('learning_outcomes').astype(str).str.contains(r'[^\s;]', regex=True)
+        flag((column('learning_outcomes').notna() & ~has_lo).to_numpy(),
+             "learning_outcomes must list at least one LO")
+        
+        task_id = pd.to_numeric(column('task_id'), errors='coerce')
+        flag((column('task_id').notna() & (task_id.isna() | (task_id % 1 != 0))).to_numpy(),
+             "task_id must be an integer")
+        
+        date_submitted = pd.to_datetime(column('date_submitted'), errors='coerce')
+        flag((column('date_submitted').notna() & date_submitted.isna()).to_numpy(),
+             "date_submitted is not a valid date")
+        
+        valid = np.array([not row_problems for row_problems in problems], dtype=bool)
+        errors = [{'row': int(row), 'errors': problems[row]} for row in np.flatnonzero(~valid)]
+        
+        records = pd.DataFrame({
+            'student_id': student_id[valid].astype('int64'),
+            'student_name': column('student_name')[valid],
+            'course': column('course')[valid],
+            'subject': column('subject')[valid],
+            'task_id': task_id[valid],
+            'task_title': column('task_title')[valid],
+            'score': score[valid],
+            'total_score': total_score[valid],
+            'date_submitted': date_submitted[valid],
+            'learning_outcomes': column('learning_outcomes')[valid],
+            'topic': column('topic')[valid]
+        })
+        
+        missing_task_id = records['task_id'].isna()
+        if missing_task_id.any():
+            records.loc[missing_task_id, 'task_id'] = self._derive_task_ids(
+                records.loc[missing_task_id, 'task_title']
+            )
+        records['task_id'] = records['task_id'].astype('int64')
+        
+        return records, errors
+    
+    def _derive_task_ids(self, task_titles):
+        """Stable task IDs for records without one: known title's ID, else a title hash"""
+        known = {}
+        if self.data is not None and len(self.data):
+            known = self.data.drop_duplicates('task_title', keep='last').set_index('task_title')['task_id'].to_dict()
+        
+        return [
+            known.get(title, DERIVED_TASK_ID_BASE + zlib.crc32(str(title).encode('utf-8')) % 1_000_000_000)
+            for title in task_titles
+        ]
+    
+    def _apply_score_changes(self, inserts, updates):
+        """
+        Incrementally fold inserted and updated raw score records into every derived table
+        
+        Only the touched students have their summary and roster rows
+        recomputed; the rollup cube subtracts the replaced records and adds
+        the new ones.
+        
+        Args:
+            inserts (pd.DataFrame): New raw score records
+            updates (pd.DataFrame): Replacement records, indexed by the row labels they replace
+            
+        Returns:
+            set: IDs of the students touched by the batch
+        """
+        touched = set(inserts['student_id'].tolist()) | set(updates['student_id'].tolist())
+        self._student_positions = None
+        self._peer_averages = None
+        
+        if self.processed_data is None:
+            self.data.loc[updates.index, updates.columns] = updates
+            self.data = pd.concat([self.data, inserts], ignore_index=True)
+            self.preprocess_data()
+            return touched
+        
+        new_processed = []
+        inserted_processed = inserted_raw = None
+        stale_los, stale_courses = set(), set()
+        
+        if len(updates):
+            prepared = self._prepare_scores(updates)
+            replaced = self.processed_data.index.isin(prepared.index)
+            self.rollup.remove(self.processed_data[replaced])
+            
+            # Sketches can't forget values; rebuild the ones the replaced records fed
+            stale_los.update(self.processed_data.loc[replaced, 'learning_outcome'].tolist())
+            stale_courses.update(self.data.loc[prepared.index, 'course'].tolist())
+            stale_courses.update(prepared['course'].tolist())
+            
+            self.data.loc[prepared.index, prepared.columns] = prepared
+            self.processed_data = self.processed_data[~replaced]
+            updated_processed = self._expand_learning_outcomes(prepared)
+            stale_los.update(updated_processed['learning_outcome'].tolist())
+            new_processed.append(updated_processed)
+        
+        if len(inserts):
+            prepared = self._prepare_scores(inserts)
+            start = int(self.data.index.max()) + 1 if len(self.data) else 0
+            prepared.index = pd.RangeIndex(start, start + len(prepared))
+            self.data = pd.concat([self.data, prepared])
+            
+            keys = zip(prepared['student_id'].tolist(), prepared['task_id'].tolist())
+            self._score_index.update(zip(keys, prepared.index.tolist()))
+            inserted_raw = prepared
+            inserted_processed = self._expand_learning_outcomes(prepared)
+            new_processed.append(inserted_processed)
+        
+        if not new_processed:
+            return touched
+        
+        new_processed = pd.concat(new_processed)
+        self.processed_data = pd.concat([self.processed_data, new_processed])
+        self._update_sketches(inserted_processed, inserted_raw, stale_los, stale_courses)
+        
+        touched_rows = self.processed_data[self.processed_data['student_id'].isin(touched)]
+        
+        summary = self.student_lo_summary
+        self.student_lo_summary = pd.concat([
+            summary[~summary['student_id'].isin(touched)],
+            self._summarize_student_los(touched_rows)
+        ]).sort_values(['student_id', 'learning_outcome'], kind='stable').reset_index(drop=True)
+        
+        self._build_roster(touched)
+        self.similarity.update(self.student_lo_summary, touched)
+        self.rollup.add(new_processed)
+        
+        print(f"📥 Applied {len(inserts)} new and {len(updates)} updated records for {len(touched)} students")
+        
+        return touched
+    
+    def _update_sketches(self, processed=None, raw=None, stale_los=(), stale_courses=()):
+        """
+        Feed new records into the per-LO and per-course score sketches
+        
+        Args:
+            processed (pd.DataFrame, optional): New LO-expanded records
+            raw (pd.DataFrame, optional): New raw score records
+            stale_los (iterable): LOs whose sketches are rebuilt from processed_data
+            stale_courses (iterable): Courses whose sketches are rebuilt from data
+        """
+        for dimension, frame, stale, source in (
+            ('learning_outcome', processed, set(stale_los), self.processed_data),
+            ('course', raw, set(stale_courses), self.data)
+        ):
+            sketches = self.score_sketches[dimension]
+            
+            for key in stale:
+                sketches.pop(key, None)
+            rebuild = source[source[dimension].isin(stale)] if stale else None
+            
+            for rows in (frame, rebuild):
+                if rows is None or not len(rows):
+                    continue
+                if rows is frame and stale:
+                    rows = rows[~rows[dimension].isin(stale)]
+                for key, scores in rows.groupby(dimension)['percentage_score']:
+                    sketches.setdefault(key, TDigest()).add(scores.to_numpy())
+    
+    def score_distribution(self, course=None, learning_outcome=None):
+        """
+        Score distribution summaries from the quantile sketches
+        
+        Args:
+            course (str, optional): Only this course
+            learning_outcome (str, optional): Only this LO
+            
+        Returns:
+            dict: Quantiles and histograms per LO and per course
+        """
+        if self.processed_data is None:
+            self.preprocess_data()
+        
+        return {
+            'learning_outcomes': {
+                lo: sketch.summary() for lo, sketch in sorted(self.score_sketches['learning_outcome'].items())
+                if learning_outcome is None or lo == learning_outcome
+            },
+            'courses': {
+                name: sketch.summary() for name, sketch in sorted(self.score_sketches['course'].items(), key=lambda item: str(item[0]))
+                if course is None or name == course
+            }
+        }
+    
+    def _peer_distributions(self):
+        """Sorted student averages per LO (student_lo_summary) and per course (roster)"""
+        peers = self._peer_averages
+        if peers is None:
+            peers = {
+                'learning_outcome': {
+                    lo: np.sort(scores.to_numpy(dtype=float))
+                    for lo, scores in self.student_lo_summary.groupby('learning_outcome')['avg_score']
+                },
+                'course': {
+                    course: np.sort(scores.to_numpy(dtype=float))
+                    for course, scores in self.roster.groupby('course')['avg_percentage']
+                }
+            }
+            self._peer_averages = peers
+        return peers
+    
+    @staticmethod
+    def _percentile_rank(sorted_values, value):
+        """Mid-rank percentile (0-100) of a value among sorted values"""
+        below = np.searchsorted(sorted_values, value, side='left')
+        at_or_below = np.searchsorted(sorted_values, value, side='right')
+        return round(float(100 * (below + at_or_below) / (2 * len(sorted_values))), 1)
+    
+    def percentile_ranks(self, student_id):
+        """
+        Percentile ranks of a student's averages among the other students' averages
+        
+        Args:
+            student_id (int): Student ID
+            
+        Returns:
+            dict: Percentile (0-100) of the student's average per LO (among the
+                  students with that LO) and within their course
+        """
+        if self.processed_data is None:
+            self.preprocess_data()
+        
+        peers = self._peer_distributions()
+        summary = self._student_slice(self.student_lo_summary, student_id)
+        ranks = {
+            'learning_outcomes': {
+                lo: self._percentile_rank(peers['learning_outcome'][lo], avg)
+                for lo, avg in zip(summary['learning_outcome'], summary['avg_score'])
+            },
+            'course': None
+        }
+        
+        roster = self._student_slice(self.roster, student_id)
+        if len(roster):
+            course = roster['course'].iloc[0]
+            # No distribution for a missing (NaN) course; leave the course rank null
+            course_averages = peers['course'].get(course) if pd.notna(course) else None
+            if course_averages is not None:
+                ranks['course'] = {
+                    'course': course,
+                    'percentile': self._percentile_rank(course_averages, roster['avg_percentage'].iloc[0])
+                }
+        
+        return ranks
+    
+    def similar_students(self, student_id, k=10):
+        """
+        Students whose per-LO performance is closest to a student's
+        
+        Args:
+            student_id (int): Student ID
+            k (int): Number of peers to return
+            
+        Returns:
+            dict: The LOs the performance vectors cover and the 'neighbors' table
+                  (roster columns plus 'distance'), nearest first
+        """
+        if self.processed_data is None:
+            self.preprocess_data()
+        
+        result = self.similarity.query(student_id, k)
+        if result is None:
+            return {"error": f"No data found for student {student_id}"}
+        
+        neighbor_ids, distances = result
+        positions = np.searchsorted(self.roster['student_id'].to_numpy(), neighbor_ids)
+        neighbors = self.roster.iloc[positions][['student_id', 'student_name', 'course', 'subject', 'avg_percentage']]
+        neighbors = neighbors.assign(distance=np.round(distances.astype(float), 4)).reset_index(drop=True)
+        
+        return {
+            'student_id': student_id,
+            'k': k,
+            'learning_outcomes': list(self.similarity.learning_outcomes),
+            'neighbors': neighbors
+        }
+    
+    def _build_roster(self, student_ids=None):
+        """
+        Build the per-student roster table served by the student list endpoint
+        
+        Sort orders for every sortable column are precomputed here so that
+        paginated queries only need a filter pass, not a sort.
+        
+        Args:
+            student_ids (set, optional): Only recompute these students' rows (default: everyone)
+        """
+        scores = self.data
+        if student_ids is not None and self.roster is not None:
+            scores = scores[scores['student_id'].isin(student_ids)]
+        
+        roster = scores.groupby('student_id').agg(
+            student_name=('student_name', 'first'),
+            course=('course', 'first'),
+            subject=('subject', 'first'),
+            total_tasks=('score', 'count'),
+            avg_percentage=('percentage_score', 'mean')
+        ).reset_index()
+        roster['avg_percentage'] = roster['avg_percentage'].round(2)
+        
+        if student_ids is not None and self.roster is not None:
+            roster = pd.concat([
+                self.roster[~self.roster['student_id'].isin(student_ids)],
+                roster
+            ]).sort_values('student_id', kind='stable').reset_index(drop=True)
+        
+        student_ids = roster['student_id'].to_numpy()
+        self.roster_sort_orders = {
+            column: np.lexsort((student_ids, roster[column].to_numpy()))
+            for column in ROSTER_SORT_COLUMNS
+        }
+        self.roster = roster
+    
+    def query_roster(self, course=None, subject=None, min_avg=None, max_avg=None,
+                     min_tasks=None, max_tasks=None, sort_by='student_id', order='asc',
+                     cursor=None, limit=100):
+        """
+        Return one page of the student roster
+        
+        Pagination is keyset-based: the cursor encodes the (sort value, student_id)
+        of the last row of the previous page, so pages stay stable while
+        students are added.
+        
+        Args:
+            course (str, optional): Only students in this course
+            subject (str, optional): Only students in this subject/section
+            min_avg (float, optional): Minimum average percentage
+            max_avg (float, optional): Maximum average percentage
+            min_tasks (int, optional): Minimum number of tasks
+            max_tasks (int, optional): Maximum number of tasks
+            sort_by (str): One of ROSTER_SORT_COLUMNS
+            order (str): 'asc' or 'desc'
+            cursor (str, optional): Cursor returned with the previous page
+            limit (int): Page size
+            
+        Returns:
+            dict: 'students' page DataFrame, 'next_cursor' (None on the last page) and 'total_count' of matches
+        """
+        if self.roster is None:
+            self.preprocess_data()
         
+        if sort_by not in ROSTER_SORT_COLUMNS:
+            raise ValueError(f"sort_by must be one of {list(ROSTER_SORT_COLUMNS)}")
+        if order not in ('asc', 'desc'):
+            raise ValueError("order must be 'asc' or 'desc'")
+        
+        position = self.roster_sort_orders[sort_by]
+        if order == 'desc':
+            position = position[::-1]
+        roster = self.roster.iloc[position]
+        
+        mask = np.ones(len(roster), dtype=bool)
+        if course is not None:
+            mask &= (roster['course'] == course).to_numpy()
+        if subject is not None:
+            mask &= (roster['subject'] == subject).to_numpy()
+        if min_avg is not None:
+            mask &= (roster['avg_percentage'] >= min_avg).to_numpy()
+        if max_avg is not None:
+            mask &= (roster['avg_percentage'] <= max_avg).to_numpy()
+        if min_tasks is not None:
+            mask &= (roster['total_tasks'] >= min_tasks).to_numpy()
+        if max_tasks is not None:
+            mask &= (roster['total_tasks'] <= max_tasks).to_numpy()
+        
+        total_count = int(mask.sum())
+        
+        if cursor:
+            last_value, last_id = self._decode_roster_cursor(cursor, sort_by, order)
+            values = roster[sort_by].to_numpy()
+            ids = roster['student_id'].to_numpy()
+            if order == 'asc':
+                mask &= (values > last_value) | ((values == last_value) & (ids > last_id))
+            else:
+                mask &= (values < last_value) | ((values == last_value) & (ids < last_id))
+        
+        matches = np.flatnonzero(mask)
+        page = roster.iloc[matches[:limit]]
+        
+        next_cursor = None
+        if len(matches) > limit:
+            last = page.iloc[-1]
+            next_cursor = self._encode_roster_cursor(sort_by, order, last[sort_by], last['student_id'])
+        
+        return {
+            'students': page,
+            'next_cursor': next_cursor,
+            'total_count': total_count
+        }
+    
+    @staticmethod
+    def _encode_roster_cursor(sort_by, order, value, student_id):
+        """Encode a keyset position as an opaque URL-safe cursor"""
+        raw = json.dumps([sort_by, order, value, student_id], default=to_builtin).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+    
+    @staticmethod
+    def _decode_roster_cursor(cursor, sort_by, order):
+        """Decode a cursor created by _encode_roster_cursor for the same sort order"""
+        try:
+            cursor_sort, cursor_order, value, student_id = json.loads(
+                base64.urlsafe_b64decode(cursor.encode('ascii'))
+            )
+        except (ValueError, TypeError):
+            raise ValueError("Invalid cursor")
+        if (cursor_sort, cursor_order) != (sort_by, order):
+            raise ValueError("Cursor was issued for a different sort order")
+        return value, student_id
+    
     def predict_lo_from_topic(self, task_title, topic=None):
         """
         Predict the most likely Learning Outcome(s) for a given task or topic
@@ -183,36 +826,130 @@ class LOAnalyzer:
         Returns:
             list: Most likely LO(s) based on keyword matching and similarity
         """
-        text_to_analyze = f"{task_title} {topic or ''}".lower()
+        return self.rank_los_for_topics([(task_title, topic)])[0]['predicted_los']
+    
+    def rank_los_for_topics(self, items):
+        """
+        Rank Learning Outcomes for many task titles/topics at once
         
-        lo_scores = {}
+        Scoring matches predict_lo_from_topic: 2 points per curriculum keyword
+        contained in the text plus 1 point per word shared with each curriculum
+        topic. The whole batch is scored as sparse matrix products against the
+        curriculum vocabulary, and repeated texts are served from a memo.
         
-        for lo, info in self.curriculum_mapping.items():
-            score = 0
+        Args:
+            items (list): (task_title, topic) pairs; topic may be None
             
-            # Keyword matching
-            keyword_matches = sum(1 for keyword in info['keywords'] if keyword in text_to_analyze)
-            score += keyword_matches * 2
+        Returns:
+            list: Per item, 'ranked' [(LO, score)] with score > 0 in descending order
+                  and 'predicted_los' (top 2, falling back to LO1)
+        """
+        texts = [f"{task_title} {topic or ''}".lower() for task_title, topic in items]
+        
+        with self._topic_lock:
+            index = self._build_topic_index()
+            
+            pending = list(dict.fromkeys(text for text in texts if text not in self._topic_cache))
+            if pending:
+                for text, scores in zip(pending, self._score_topic_texts(pending, index)):
+                    self._topic_cache[text] = scores
+            
+            text_scores = []
+            for text in texts:
+                text_scores.append(self._topic_cache[text])
+                self._topic_cache.move_to_end(text)
             
-            # Topic similarity
-            for curriculum_topic in info['topics']:
-                topic_words = set(curriculum_topic.lower().split())
-                text_words = set(text_to_analyze.split())
-                common_words = topic_words.intersection(text_words)
-                score += len(common_words)
+            while len(self._topic_cache) > TOPIC_CACHE_SIZE:
+                self._topic_cache.popitem(last=False)
+        
+        los = index['los']
+        results = []
+        for scores in text_scores:
+            # Stable sort keeps curriculum order between equal scores
+            order = np.argsort(-scores, kind='stable')
+            ranked = [(los[i], int(scores[i])) for i in order if scores[i] > 0]
+            predicted_los = [lo for lo, _ in ranked[:2]] or ['LO1']  # Fallback: LO1 for unknown tasks
             
-            lo_scores[lo] = score
+            results.append({'ranked': ranked, 'predicted_los': predicted_los})
         
-        # Return LOs with highest scores (minimum score of 1 to be considered)
-        sorted_los = sorted(lo_scores.items(), key=lambda x: x[1], reverse=True)
-        predicted_los = [lo for lo, score in sorted_los if score > 0]
+        return results
+    
+    def _build_topic_index(self):
+        """Build the sparse curriculum matrices used by rank_los_for_topics"""
+        if self._topic_index is not None:
+            return self._topic_index
+        
+        los = list(self.curriculum_mapping)
+        
+        # Curriculum topic words: weight = number of the LO's topics containing the word
+        vocabulary = {}
+        rows, cols = [], []
+        for lo_idx, lo in enumerate(los):
+            for curriculum_topic in self.curriculum_mapping[lo]['topics']:
+                for word in set(curriculum_topic.lower().split()):
+                    rows.append(vocabulary.setdefault(word, len(vocabulary)))
+                    cols.append(lo_idx)
+        topic_weights = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)), shape=(len(vocabulary), len(los))
+        )
         
-        if not predicted_los:
-            # Fallback: return LO1 for unknown tasks
-            predicted_los = ['LO1']
+        # Keywords: one row per distinct keyword, flagging the LOs that list it
+        keywords = {}
+        rows, cols = [], []
+        for lo_idx, lo in enumerate(los):
+            for keyword in self.curriculum_mapping[lo]['keywords']:
+                rows.append(keywords.setdefault(keyword, len(keywords)))
+                cols.append(lo_idx)
+        keyword_weights = sparse.csr_matrix(
+            (np.full(len(rows), 2.0), (rows, cols)), shape=(len(keywords), len(los))
+        )
+        
+        self._topic_index = {
+            'los': los,
+            'vocabulary': vocabulary,
+            'topic_weights': topic_weights,
+            'keywords': list(keywords),
+            'keyword_weights': keyword_weights,
+            'token_keywords': {}
+        }
+        return self._topic_index
+    
+    def _score_topic_texts(self, texts, index):
+        """Score lowercased texts against every LO in one batch of sparse products"""
+        vocabulary = index['vocabulary']
+        keywords = index['keywords']
+        token_keywords = index['token_keywords']
+        
+        word_rows, word_cols = [], []
+        hit_rows, hit_cols = [], []
+        for row, text in enumerate(texts):
+            for token in set(text.split()):
+                if token in vocabulary:
+                    word_rows.append(row)
+                    word_cols.append(vocabulary[token])
+                
+                # Keywords contain no whitespace, so "keyword in text" holds iff
+                # some token contains it; containment is memoized per token
+                if token not in token_keywords:
+                    if len(token_keywords) >= TOPIC_CACHE_SIZE * 8:
+                        token_keywords.clear()
+                    token_keywords[token] = [k for k, keyword in enumerate(keywords) if keyword in token]
+                hit_cols.extend(token_keywords[token])
+                hit_rows.extend([row] * len(token_keywords[token]))
+        
+        words = sparse.csr_matrix(
+            (np.ones(len(word_rows)), (word_rows, word_cols)), shape=(len(texts), len(vocabulary))
+        )
+        keyword_hits = sparse.csr_matrix(
+            (np.ones(len(hit_rows)), (hit_rows, hit_cols)), shape=(len(texts), len(keywords))
+        )
+        # A keyword counts once per text even if several tokens contain it
+        keyword_hits.data[:] = 1
         
-        return predicted_los[:2]  # Return top 2 most likely LOs
+        scores = words @ index['topic_weights'] + keyword_hits @ index['keyword_weights']
+        return np.asarray(scores.toarray())
     
+    @_exclusive
     def train_models(self):
         """
         Train multiple ML models for LO achievement prediction
@@ -230,7 +967,6 @@ class LOAnalyzer:
         # Encode categorical variables
         le_lo = LabelEncoder()
         features_df['lo_encoded'] = le_lo.fit_transform(features_df['learning_outcome'])
-        self.label_encoders['learning_outcome'] = le_lo
         
         # Features for training
         feature_columns = ['avg_score', 'score_std', 'task_count', 'lo_encoded']
@@ -244,7 +980,6 @@ class LOAnalyzer:
         scaler = StandardScaler()
         X_train_scaled = scaler.fit_transform(X_train)
         X_test_scaled = scaler.transform(X_test)
-        self.scalers['main'] = scaler
         
         # Train Random Forest
         rf_model = RandomForestClassifier(n_estimators=100, random_state=42)
@@ -252,15 +987,17 @@ class LOAnalyzer:
         rf_pred = rf_model.predict(X_test_scaled)
         rf_accuracy = accuracy_score(y_test, rf_pred)
         
-        self.models['random_forest'] = rf_model
-        
         # Train Logistic Regression
         lr_model = LogisticRegression(random_state=42)
         lr_model.fit(X_train_scaled, y_train)
         lr_pred = lr_model.predict(X_test_scaled)
         lr_accuracy = accuracy_score(y_test, lr_pred)
         
-        self.models['logistic_regression'] = lr_model
+        # Swap in the new models only once all of them are fitted
+        self.label_encoders = {'learning_outcome': le_lo}
+        self.scalers = {'main': scaler}
+        self.models = {'random_forest': rf_model, 'logistic_regression': lr_model}
+        self._fitted = (le_lo, scaler, rf_model, lr_model)
         
         print(f"🎯 Random Forest Accuracy: {rf_accuracy:.3f}")
         print(f"🎯 Logistic Regression Accuracy: {lr_accuracy:.3f}")
@@ -274,11 +1011,366 @@ class LOAnalyzer:
         print("\n📈 Feature Importance (Random Forest):")
         for _, row in feature_importance.iterrows():
             print(f"  {row['feature']}: {row['importance']:.3f}")
+        
+        # New model version; its training data becomes the drift baseline
+        self.model_version += 1
+        self.state_tag = uuid.uuid4().hex[:12]
+        self.model_signature = None
+        self.training_baseline = self.retraining_policy.snapshot(self.student_lo_summary, len(self.data))
+        
+        # A model swap invalidates every materialized prediction
+        self.refresh_predictions()
+    
+    def save_models(self, path):
+        """
+        Persist the trained models so other processes can score without retraining
+        
+        Args:
+            path (str): Destination file (joblib format)
+        """
+        if not self.models:
+            self.train_models()
+        
+        joblib.dump({
+            'models': self.models,
+            'scalers': self.scalers,
+            'label_encoders': self.label_encoders,
+            'model_version': self.model_version,
+            'training_baseline': self.training_baseline,
+            'achievement_threshold': self.achievement_threshold,
+            'saved_at': datetime.now().isoformat()
+        }, path)
+        print(f"💾 Saved model version {self.model_version} to {path}")
+    
+    @_exclusive
+    def load_models(self, path):
+        """
+        Load models written by save_models() and re-score every student with them
+        
+        Args:
+            path (str): Model file written by save_models()
+        """
+        if self.processed_data is None:
+            self.preprocess_data()
+        
+        bundle = joblib.load(path)
+        self.models = bundle['models']
+        self.scalers = bundle['scalers']
+        self.label_encoders = bundle['label_encoders']
+        self._fitted = (self.label_encoders['learning_outcome'], self.scalers['main'],
+                        self.models['random_forest'], self.models['logistic_regression'])
+        self.model_version = bundle['model_version']
+        self.state_tag = uuid.uuid4().hex[:12]
+        self.model_signature = file_signature(path)
+        self.training_baseline = bundle['training_baseline']
+        print(f"📦 Loaded model version {self.model_version} from {path}")
+        
+        self.refresh_predictions()
+    
+    @_exclusive
+    def refresh_predictions(self, student_ids=None):
+        """
+        Recompute the materialized predictions table
+        
+        Args:
+            student_ids (iterable, optional): Only re-score these students (default: everyone)
+        """
+        if student_ids is None:
+            self.predictions = self._score_summary(self.student_lo_summary)
+            self._dirty_students.clear()
+        else:
+            student_ids = set(student_ids)
+            if not student_ids:
+                return
+            
+            rows = self.student_lo_summary[self.student_lo_summary['student_id'].isin(student_ids)]
+            scored = self._score_summary(rows)
+            
+            kept = self.predictions[~self.predictions.index.isin(student_ids)]
+            self.predictions = pd.concat([kept, scored]).sort_index(kind='stable')
+            self._dirty_students -= student_ids
+        
+        # Diff the at-risk state against the previous predictions
+        self.alerts.sweep(self.predictions)
+    
+    def get_alert_changes(self, since=None, stream=None):
+        """
+        At-risk alert changes since a given alert version
+        
+        Args:
+            since (int, optional): Last alert version the caller has seen
+            stream (str, optional): Alert stream that version came from
+            
+        Returns:
+            dict: Alert version, reset flag and change events (see AlertTracker.changes_since)
+        """
+        if not self.models:
+            self.train_models()
+        
+        self._rescore_dirty()
+        return self.alerts.changes_since(since, stream)
+    
+    def _rescore_dirty(self):
+        """Re-score the students whose scores changed since the last refresh"""
+        if not self._dirty_students:
+            return
+        # Readers re-score lazily; the lock keeps them from racing a writer (or each other)
+        with self._write_lock:
+            if self._dirty_students:
+                print(f"♻️ Re-scoring {len(self._dirty_students)} students")
+                self.refresh_predictions(set(self._dirty_students))
+    
+    def _score_summary(self, rows):
+        """
+        Run both models over student_lo_summary rows in one batch
+        
+        Args:
+            rows (pd.DataFrame): Rows of student_lo_summary
+            
+        Returns:
+            pd.DataFrame: Predictions indexed by student_id, sorted by (student_id, learning_outcome)
+        """
+        rows = rows.sort_values(['student_id', 'learning_outcome'], kind='stable')
+        
+        rf_prob, lr_prob, rf_pred, lr_pred = self._model_probabilities(
+            rows['avg_score'], rows['score_std'], rows['task_count'], rows['learning_outcome']
+        )
+        
+        achievement_rate = rows['achievement_rate'].to_numpy(dtype=float)
+        
+        predictions = pd.DataFrame({
+            'student_id': rows['student_id'].to_numpy(),
+            'learning_outcome': rows['learning_outcome'].to_numpy(),
+            'model_version': self.model_version,
+            'current_achievement_rate': achievement_rate,
+            'current_status': np.where(achievement_rate >= 0.7, 'Achieved', 'Not Achieved'),
+            'current_avg_score': rows['avg_score'].to_numpy(dtype=float),
+            'task_count': rows['task_count'].to_numpy(dtype=int),
+            'rf_prediction': np.where(rf_pred == 1, 'Will Achieve', 'May Not Achieve'),
+            'rf_probability': rf_prob,
+            'lr_prediction': np.where(lr_pred == 1, 'Will Achieve', 'May Not Achieve'),
+            'lr_probability': lr_prob,
+            'ensemble_probability': (rf_prob + lr_prob) / 2,
+            'recommendation': [
+                self._generate_recommendation(row, rf, lr)
+                for row, rf, lr in zip(rows.to_dict('records'), rf_prob, lr_prob)
+            ]
+        })
+        
+        return predictions.set_index('student_id', drop=False)
+    
+    def _model_probabilities(self, avg_score, score_std, task_count, learning_outcome):
+        """
+        Run both models over feature columns in one batch
+        
+        Returns:
+            tuple: (rf_probability, lr_probability, rf_prediction, lr_prediction) arrays
+        """
+        label_encoder, scaler, rf_model, lr_model = self._fitted
+        lo_encoded = label_encoder.transform(np.asarray(learning_outcome))
+        features = np.column_stack([
+            np.asarray(avg_score, dtype=float),
+            np.asarray(score_std, dtype=float),
+            np.asarray(task_count, dtype=float),
+            lo_encoded
+        ])
+        
+        if not len(features):
+            return np.empty(0), np.empty(0), np.empty(0, dtype=int), np.empty(0, dtype=int)
+        
+        features_scaled = scaler.transform(features)
+        rf_prob = rf_model.predict_proba(features_scaled)
+        lr_prob = lr_model.predict_proba(features_scaled)
+        # Same as model.predict(), without running the models twice
+        rf_pred = rf_model.classes_[rf_prob.argmax(axis=1)]
+        lr_pred = lr_model.classes_[lr_prob.argmax(axis=1)]
+        
+        return rf_prob[:, 1], lr_prob[:, 1], rf_pred, lr_pred
+    
+    def evaluate_retraining(self):
+        """
+        Check whether the current data has drifted far enough from the
+        data the models were trained on to require retraining
+        
+        Returns:
+            dict: Retraining decision with reason, triggers and drift metrics
+        """
+        if self.processed_data is None:
+            self.preprocess_data()
+        
+        return self.retraining_policy.evaluate(
+            self.training_baseline if self.models else None,
+            self.student_lo_summary,
+            len(self.data)
+        )
+    
+    @_exclusive
+    def ingest_scores(self, new_scores, force_retrain=False):
+        """
+        Upsert score records keyed on (student_id, task_id) and retrain only
+        if the retraining policy asks for it
+        
+        Re-sending records that are already stored changes nothing, so
+        repeated gradebook syncs are idempotent and nearly free.
+        
+        Args:
+            new_scores (pd.DataFrame): Score records with the same columns as the CSV
+            force_retrain (bool): Retrain regardless of the policy decision
+            
+        Returns:
+            dict: Retraining decision, including whether the models were retrained,
+                  and the 'batch' summary (inserted/updated/unchanged/rejected and per-row errors)
+        """
+        records, errors = self.validate_scores(new_scores)
+        
+        # Within a batch the last record for a key wins
+        deduplicated = records.drop_duplicates(['student_id', 'task_id'], keep='last')
+        
+        labels = [self._score_index.get(key) for key in
+                  zip(deduplicated['student_id'].tolist(), deduplicated['task_id'].tolist())]
+        exists = np.array([label is not None for label in labels], dtype=bool)
+        
+        inserts = deduplicated[~exists].copy()
+        candidates = deduplicated[exists].set_index(pd.Index([l for l in labels if l is not None]))
+        
+        # A partial re-send keeps the stored optional fields; only new records get defaults
+        optional = list(OPTIONAL_SCORE_DEFAULTS) + ['date_submitted']
+        candidates[optional] = candidates[optional].fillna(self.data.loc[candidates.index, optional])
+        for field, default in OPTIONAL_SCORE_DEFAULTS.items():
+            inserts[field] = inserts[field].fillna(default)
+        inserts['date_submitted'] = inserts['date_submitted'].fillna(pd.Timestamp(datetime.now().date()))
+        
+        # Compare against the stored records; only real changes are updates
+        compare = [column for column in SCORE_COLUMNS if column not in ('student_id', 'task_id')]
+        stored = self.data.loc[candidates.index, compare]
+        incoming = candidates[compare]
+        same = (stored.to_numpy() == incoming.to_numpy()) | (stored.isna().to_numpy() & incoming.isna().to_numpy())
+        changed = ~same.all(axis=1) if len(candidates) else np.zeros(0, dtype=bool)
+        updates = candidates[changed]
+        
+        batch = {
+            'received': int(len(new_scores)),
+            'inserted': int(len(inserts)),
+            'updated': int(len(updates)),
+            'unchanged': int(len(candidates) - len(updates)),
+            'duplicates_in_batch': int(len(records) - len(deduplicated)),
+            'rejected': len(errors),
+            'errors': errors
+        }
+        
+        if not len(inserts) and not len(updates) and not force_retrain:
+            decision = {
+                'retrain': False,
+                'reason': 'no_changes',
+                'triggers': [],
+                'metrics': {},
+                'evaluated_at': datetime.now().isoformat(),
+                'model_version': self.model_version,
+                'data_version': self.data_version,
+                'batch': batch
+            }
+            print("⏭️ Score batch contained no changes")
+            return decision
+        
+        touched = self._apply_score_changes(inserts, updates)
+        if len(inserts) or len(updates):
+            self.data_version += 1
+            self.state_tag = uuid.uuid4().hex[:12]
+            self.data_signature = None
+        
+        # Only the students in this batch have new predictions
+        self._dirty_students.update(touched)
+        
+        decision = self._apply_retraining_policy(force_retrain)
+        decision['batch'] = batch
+        
+        return decision
+    
+    def data_file_changed(self):
+        """Whether the scores CSV differs from the version this analyzer loaded or saved"""
+        return self.data_signature is None or self.data_signature != file_signature(self.csv_path)
+    
+    def save_data(self, path=None):
+        """
+        Write the score records to a CSV atomically
+        
+        The records go to a temporary file in the same directory that then
+        replaces the target, so readers never see a partially written file.
+        Callers updating a shared file should hold data_file_lock(path).
+        
+        Args:
+            path (str, optional): Destination (default: the analyzer's csv_path)
+        """
+        path = path or self.csv_path
+        fd, staging = tempfile.mkstemp(prefix='.scores-', suffix='.csv.tmp',
+                                       dir=os.path.dirname(os.path.abspath(path)))
+        try:
+            with os.fdopen(fd, 'w', newline='') as f:
+                self.data[SCORE_COLUMNS].to_csv(f, index=False)
+            # mkstemp creates the file owner-only; keep the target's permissions
+            os.chmod(staging, os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644)
+            os.replace(staging, path)
+        except BaseException:
+            if os.path.exists(staging):
+                os.remove(staging)
+            raise
+        
+        if os.path.abspath(path) == os.path.abspath(self.csv_path):
+            self.data_signature = file_signature(path)
+    
+    @_exclusive
+    def reload_data(self, force_retrain=False, model_path=None):
+        """
+        Re-read the scores CSV (e.g. after another process updated it) and
+        retrain only if the retraining policy asks for it
+        
+        Args:
+            force_retrain (bool): Retrain regardless of the policy decision
+            model_path (str, optional): Load these saved models before the
+                policy runs, so drift is measured against their baseline
+            
+        Returns:
+            dict: Retraining decision, including whether the models were retrained
+        """
+        self.load_data()
+        self.data_version += 1
+        self.state_tag = uuid.uuid4().hex[:12]
+        self.preprocess_data()
+        
+        # The file may have changed anywhere
+        self._dirty_students.update(self.student_lo_summary['student_id'].unique().tolist())
+        
+        if model_path:
+            self.load_models(model_path)
+        
+        return self._apply_retraining_policy(force_retrain)
+    
+    def _apply_retraining_policy(self, force_retrain=False):
+        """Evaluate the retraining policy on the current data and retrain if needed"""
+        decision = self.evaluate_retraining()
+        if force_retrain and not decision['retrain']:
+            decision.update(retrain=True, reason='forced', triggers=['forced'] + decision['triggers'])
+        
+        if decision['retrain']:
+            print(f"🔁 Retraining models (reason: {decision['reason']})")
+            self.train_models()
+        else:
+            print(f"⏭️ Skipping retraining (model version {self.model_version} within drift thresholds)")
+            self._rescore_dirty()
+        
+        decision['model_version'] = self.model_version
+        decision['data_version'] = self.data_version
+        self.last_retrain_decision = decision
+        
+        return decision
     
     def predict_student_lo_achievement(self, student_id, learning_outcome=None):
         """
         Predict LO achievement for a specific student
         
+        Predictions are read from the materialized predictions table, which is
+        re-scored when the student's scores change or the models are retrained.
+        
         Args:
             student_id (int): Student ID
             learning_outcome (str, optional): Specific LO to predict
@@ -289,59 +1381,265 @@ class LOAnalyzer:
         if not self.models:
             self.train_models()
         
-        student_data = self.student_lo_summary[
-            self.student_lo_summary['student_id'] == student_id
-        ].copy()
+        self._rescore_dirty()
+        predictions_table = self.predictions
         
-        if student_data.empty:
+        if student_id not in predictions_table.index:
             return {"error": f"No data found for student {student_id}"}
         
+        student_data = predictions_table.loc[[student_id]]
+        
         if learning_outcome:
             student_data = student_data[student_data['learning_outcome'] == learning_outcome]
             if student_data.empty:
                 return {"error": f"No data found for student {student_id} and LO {learning_outcome}"}
         
-        predictions = {}
+        return self.format_predictions(student_data.to_dict('records'))
+    
+    def format_predictions(self, rows):
+        """
+        Build the per-LO prediction response from one student's prediction rows
         
-        for _, row in student_data.iterrows():
-            lo = row['learning_outcome']
-            
-            # Prepare features
-            lo_encoded = self.label_encoders['learning_outcome'].transform([lo])[0]
-            features = np.array([[row['avg_score'], row['score_std'], row['task_count'], lo_encoded]])
-            features_scaled = self.scalers['main'].transform(features)
-            
-            # Get predictions from both models
-            rf_pred = self.models['random_forest'].predict(features_scaled)[0]
-            rf_prob = self.models['random_forest'].predict_proba(features_scaled)[0]
-            
-            lr_pred = self.models['logistic_regression'].predict(features_scaled)[0]
-            lr_prob = self.models['logistic_regression'].predict_proba(features_scaled)[0]
-            
-            # Current achievement status
-            current_achievement = row['achievement_rate'] >= 0.7
+        Labels and recommendations are derived from the numbers, so rows read
+        from the published shared state format exactly like materialized ones.
+        
+        Args:
+            rows (list): Row dicts with learning_outcome, model_version, current_achievement_rate,
+                         current_avg_score, task_count and the rf/lr/ensemble probabilities
             
-            predictions[lo] = {
-                'current_achievement_rate': row['achievement_rate'],
-                'current_status': 'Achieved' if current_achievement else 'Not Achieved',
-                'current_avg_score': row['avg_score'],
+        Returns:
+            dict: LO -> prediction details
+        """
+        predictions = {}
+        
+        for row in rows:
+            rf_prob, lr_prob = float(row['rf_probability']), float(row['lr_probability'])
+            summary_row = {
+                'learning_outcome': row['learning_outcome'],
+                'avg_score': row['current_avg_score'],
+                'achievement_rate': row['current_achievement_rate']
+            }
+            predictions[row['learning_outcome']] = {
+                'current_achievement_rate': float(row['current_achievement_rate']),
+                'current_status': 'Achieved' if row['current_achievement_rate'] >= 0.7 else 'Not Achieved',
+                'current_avg_score': float(row['current_avg_score']),
                 'task_count': int(row['task_count']),
                 'predictions': {
                     'random_forest': {
-                        'prediction': 'Will Achieve' if rf_pred == 1 else 'May Not Achieve',
-                        'probability': float(rf_prob[1])
+                        'prediction': 'Will Achieve' if rf_prob > 0.5 else 'May Not Achieve',
+                        'probability': rf_prob
                     },
                     'logistic_regression': {
-                        'prediction': 'Will Achieve' if lr_pred == 1 else 'May Not Achieve',
-                        'probability': float(lr_prob[1])
+                        'prediction': 'Will Achieve' if lr_prob > 0.5 else 'May Not Achieve',
+                        'probability': lr_prob
                     }
                 },
-                'ensemble_probability': float((rf_prob[1] + lr_prob[1]) / 2),
-                'recommendation': self._generate_recommendation(row, rf_prob[1], lr_prob[1])
+                'ensemble_probability': float(row['ensemble_probability']),
+                'recommendation': self._generate_recommendation(summary_row, rf_prob, lr_prob),
+                'model_version': int(row['model_version'])
             }
         
         return predictions
     
+    def publish_shared_state(self, directory):
+        """
+        Publish the summary features, student offsets and predictions as a new
+        memory-mapped shared state version (see shared_state.py)
+        
+        Args:
+            directory (str): State directory read by the API workers
+            
+        Returns:
+            str: Name of the published version
+        """
+        if not self.models:
+            self.train_models()
+        self._rescore_dirty()
+        
+        rows = self.student_lo_summary.merge(
+            self.predictions[['student_id', 'learning_outcome', 'rf_probability',
+                              'lr_probability', 'ensemble_probability']].reset_index(drop=True),
+            on=['student_id', 'learning_outcome'], how='left'
+        ).sort_values(['student_id', 'learning_outcome'], kind='stable')
+        
+        learning_outcomes, lo_codes = np.unique(rows['learning_outcome'].to_numpy(dtype=str), return_inverse=True)
+        student_ids, starts = np.unique(rows['student_id'].to_numpy(dtype=np.int64), return_index=True)
+        
+        arrays = {
+            'student_ids': student_ids,
+            'offsets': np.append(starts, len(rows)).astype(np.int64),
+            'learning_outcome': lo_codes.astype(np.int16),
+            'avg_score': rows['avg_score'].to_numpy(dtype=float),
+            'score_std': rows['score_std'].to_numpy(dtype=float),
+            'task_count': rows['task_count'].to_numpy(dtype=np.int32),
+            'achievement_rate': rows['achievement_rate'].to_numpy(dtype=float),
+            'rf_probability': rows['rf_probability'].to_numpy(dtype=float),
+            'lr_probability': rows['lr_probability'].to_numpy(dtype=float),
+            'ensemble_probability': rows['ensemble_probability'].to_numpy(dtype=float)
+        }
+        meta = {
+            'data_version': self.data_version,
+            'model_version': self.model_version,
+            'learning_outcomes': learning_outcomes.tolist(),
+            'rows': int(len(rows)),
+            'students': int(len(student_ids))
+        }
+        
+        version = shared_state.publish(directory, arrays, meta)
+        print(f"🗂️ Published shared state {version} ({len(rows)} rows) to {directory}")
+        return version
+    
+    def simulate_scores(self, student_ids=None, section=None, course=None, future_scores=None,
+                        remaining_tasks=None, solve=False, target_probability=AT_RISK_PROBABILITY):
+        """
+        What-if simulation of future task scores per LO
+        
+        The aggregate features are updated analytically from each (student, LO)
+        pair's running sums (sum = avg * n, sum of squares = std^2 * (n - 1) + n * avg^2),
+        so no score records are touched. The current state, the scenario and the
+        whole solver grid are scored in one batched model call.
+        
+        Args:
+            student_ids (list, optional): Students to simulate
+            section (str, optional): Simulate every student of this subject/section instead
+            course (str, optional): Restrict the section to this course
+            future_scores (dict, optional): LO -> hypothetical percentage scores of upcoming tasks
+            remaining_tasks (dict, optional): LO -> number of upcoming tasks when solving
+                                              (default: the number of future_scores given for the LO)
+            solve (bool): Also find the minimum uniform score on the remaining tasks that lifts
+                          the ensemble probability to target_probability
+            target_probability (float): Ensemble probability the solver aims for
+            
+        Returns:
+            pd.DataFrame: One row per (student, LO) with current and scenario features,
+                          probabilities and, when solving, the required score
+            
+        Raises:
+            ValueError: Invalid students, LOs or scores
+        """
+        if not self.models:
+            self.train_models()
+        
+        future_scores = future_scores or {}
+        remaining_tasks = remaining_tasks or {}
+        
+        if student_ids is None and section is not None:
+            roster = self.roster[self.roster['subject'] == section]
+            if course is not None:
+                roster = roster[roster['course'] == course]
+            student_ids = roster['student_id'].tolist()
+        if not student_ids:
+            raise ValueError("No students to simulate; give student_ids or a section with students")
+        unknown = sorted(set(student_ids) - set(self.roster['student_id'].tolist()))
+        if unknown:
+            raise ValueError(f"Unknown students: {unknown[:10]}")
+        
+        learning_outcomes = sorted(set(future_scores) | set(remaining_tasks))
+        if not learning_outcomes:
+            raise ValueError("Give future_scores and/or remaining_tasks for at least one LO")
+        untrained = [lo for lo in learning_outcomes if lo not in self._fitted[0].classes_]
+        if untrained:
+            raise ValueError(f"The models have not been trained on: {untrained}")
+        
+        future = {lo: np.asarray(future_scores.get(lo, []), dtype=float) for lo in learning_outcomes}
+        for lo, scores in future.items():
+            if ((scores < 0) | (scores > 100) | np.isnan(scores)).any():
+                raise ValueError(f"Future scores for {lo} must be percentages between 0 and 100")
+        remaining = {lo: int(remaining_tasks.get(lo, len(future[lo]))) for lo in learning_outcomes}
+        if solve and min(remaining.values()) < 1:
+            raise ValueError("Solving needs at least one remaining task per LO")
+        
+        # Every requested (student, LO) pair; pairs without records start from zero
+        pairs = pd.MultiIndex.from_product([sorted(set(student_ids)), learning_outcomes],
+                                           names=['student_id', 'learning_outcome']).to_frame(index=False)
+        
+        # Current state, the scenario and (when solving) one block per grid score;
+        # checked before any block is built
+        grid = SIMULATION_SCORE_GRID if solve else np.empty(0)
+        scenario_rows = len(pairs) * (2 + len(grid))
+        if scenario_rows > MAX_SIMULATION_ROWS:
+            raise ValueError(f"Simulation too large ({scenario_rows} scenario rows, "
+                             f"max {MAX_SIMULATION_ROWS}); simulate fewer students or LOs")
+        
+        rows = pairs.merge(self.student_lo_summary, on=['student_id', 'learning_outcome'], how='left')
+        
+        lo = rows['learning_outcome'].to_numpy()
+        n = rows['task_count'].fillna(0).to_numpy(dtype=float)
+        avg = rows['avg_score'].fillna(0).to_numpy(dtype=float)
+        std = rows['score_std'].fillna(0).to_numpy(dtype=float)
+        rate = rows['achievement_rate'].fillna(0).to_numpy(dtype=float)
+        
+        total = avg * n
+        sumsq = std ** 2 * np.maximum(n - 1, 0) + n * avg ** 2
+        achieved = np.round(rate * n)
+        
+        def extend(count, added_sum, added_sumsq):
+            """Features after adding `count` scores with the given sum and sum of squares"""
+            new_n = n + count
+            new_avg = np.divide(total + added_sum, new_n, out=np.zeros_like(new_n), where=new_n > 0)
+            variance = np.divide(sumsq + added_sumsq - new_n * new_avg ** 2, new_n - 1,
+                                 out=np.zeros_like(new_n), where=new_n > 1)
+            return new_avg, np.sqrt(np.maximum(variance, 0)), new_n
+        
+        def per_row(values):
+            return np.array([values[outcome] for outcome in lo], dtype=float)
+        
+        future_count = per_row({k: len(v) for k, v in future.items()})
+        future_sum = per_row({k: v.sum() for k, v in future.items()})
+        future_sumsq = per_row({k: (v ** 2).sum() for k, v in future.items()})
+        future_achieved = per_row({k: (v >= self.achievement_threshold).sum() for k, v in future.items()})
+        remaining_count = per_row(remaining)
+        
+        blocks = [(avg, std, n), extend(future_count, future_sum, future_sumsq)]
+        for score in grid:
+            blocks.append(extend(remaining_count, score * remaining_count, score ** 2 * remaining_count))
+        
+        # The whole scenario grid in one batched model call
+        rf_prob, lr_prob, _, _ = self._model_probabilities(
+            np.concatenate([block[0] for block in blocks]),
+            np.concatenate([block[1] for block in blocks]),
+            np.concatenate([block[2] for block in blocks]),
+            np.tile(lo, len(blocks))
+        )
+        probability = ((rf_prob + lr_prob) / 2).reshape(len(blocks), len(rows))
+        
+        scenario_avg, scenario_std, scenario_n = blocks[1]
+        scenario_rate = np.divide(achieved + future_achieved, scenario_n,
+                                  out=np.zeros_like(scenario_n), where=scenario_n > 0)
+        
+        result = pd.DataFrame({
+            'student_id': rows['student_id'].to_numpy(),
+            'learning_outcome': lo,
+            'task_count': n.astype(int),
+            'avg_score': avg.round(2),
+            'score_std': std.round(2),
+            'achievement_rate': rate.round(3),
+            'ensemble_probability': probability[0].round(4),
+            'future_task_count': future_count.astype(int),
+            'scenario_avg_score': scenario_avg.round(2),
+            'scenario_score_std': scenario_std.round(2),
+            'scenario_achievement_rate': scenario_rate.round(3),
+            'scenario_status': np.where(scenario_rate >= 0.7, 'Achieved', 'Not Achieved'),
+            'scenario_probability': probability[1].round(4)
+        })
+        
+        if solve:
+            reached = probability[2:] >= target_probability
+            first = reached.argmax(axis=0)
+            required = np.where(reached.any(axis=0), grid[first], np.nan)
+            
+            # Tasks at or above the threshold needed to bring the achievement rate to 70%
+            needed = np.maximum(np.ceil(0.7 * (n + remaining_count) - achieved - 1e-9), 0)
+            
+            needed = np.where(needed <= remaining_count, needed, np.nan)
+            
+            # Unreachable targets are None
+            result['remaining_tasks'] = remaining_count.astype(int)
+            result['required_score'] = pd.Series([None if np.isnan(x) else int(x) for x in required], dtype=object)
+            result['tasks_needed_at_threshold'] = pd.Series([None if np.isnan(x) else int(x) for x in needed], dtype=object)
+        
+        return result
+    
     def _generate_recommendation(self, student_row, rf_prob, lr_prob):
         """Generate personalized recommendations based on student performance"""
         avg_prob = (rf_prob + lr_prob) / 2
@@ -354,14 +1652,29 @@ class LOAnalyzer:
         elif avg_prob >= 0.6 and achievement_rate >= 0.5:
             return f"👍 Good progress in {lo}. Focus on consistency to maintain achievement."
         elif avg_prob >= 0.4:
-            return f"⚠️ {lo} needs attention. Current average: {avg_score:.1f}%. Recommend additional practice and review of {self.curriculum_mapping[lo]['description'].lower()}."
+            return f"⚠️ {lo} needs attention. Current average: {avg_score:.1f}%. Recommend additional practice and review of {self.lo_description(lo).lower()}."
         else:
             return f"🚨 {lo} requires immediate intervention. Consider one-on-one tutoring, review of fundamental concepts, and additional assignments."
     
-    def analyze_class_performance(self):
+    def lo_description(self, lo):
+        """Curriculum description of an LO (the LO code itself if it isn't mapped)"""
+        return self.curriculum_mapping.get(lo, {}).get('description', lo)
+    
+    def analyze_class_performance(self, course=None, subject=None, learning_outcome=None,
+                                  date_from=None, date_to=None):
         """
         Analyze overall class performance and generate insights
         
+        Statistics are answered from the rollup cube, so any slice costs
+        O(cells) rather than O(records).
+        
+        Args:
+            course (str, optional): Only this course
+            subject (str, optional): Only this subject/section
+            learning_outcome (str, optional): Only this LO
+            date_from (str, optional): Start of the submission date range (week granularity)
+            date_to (str, optional): End of the submission date range (week granularity)
+        
         Returns:
             dict: Comprehensive class analysis
         """
@@ -370,25 +1683,23 @@ class LOAnalyzer:
         
         analysis = {}
         
+        rollup = self.rollup.query(course, subject, learning_outcome, date_from, date_to)
+        
         # Overall class statistics
-        analysis['overall_stats'] = {
-            'total_students': int(self.processed_data['student_id'].nunique()),
-            'total_tasks': int(self.processed_data['task_title'].nunique()),
-            'overall_achievement_rate': float(self.processed_data['achieved'].mean()),
-            'average_score': float(self.processed_data['percentage_score'].mean())
-        }
+        analysis['overall_stats'] = rollup['overall']
         
         # LO-specific analysis
-        lo_analysis = self.processed_data.groupby('learning_outcome').agg({
-            'achieved': ['mean', 'count'],
-            'percentage_score': ['mean', 'std']
-        }).round(3)
+        analysis['lo_performance'] = rollup['lo_performance']
+        analysis['weekly_trend'] = rollup['weekly_trend']
         
-        lo_analysis.columns = ['achievement_rate', 'total_attempts', 'avg_score', 'score_std']
-        analysis['lo_performance'] = lo_analysis.to_dict('index')
+        # Student performance distribution (over the students in the slice)
+        summary = self.student_lo_summary
+        if any(value is not None for value in (course, subject, learning_outcome, date_from, date_to)):
+            summary = summary[summary['student_id'].isin(rollup['student_ids'])]
+            if learning_outcome is not None:
+                summary = summary[summary['learning_outcome'] == learning_outcome]
         
-        # Student performance distribution
-        student_performance = self.student_lo_summary.groupby('student_id').agg({
+        student_performance = summary.groupby('student_id').agg({
             'achievement_rate': 'mean',
             'avg_score': 'mean'
         }).reset_index()
@@ -400,6 +1711,24 @@ class LOAnalyzer:
             'needs_support': int((student_performance['achievement_rate'] < 0.6).sum())
         }
         
+        # Quantiles and histograms from the sketches, which only exist per LO and
+        # per course; say which of the requested filters they do not reflect
+        analysis['score_distribution'] = {
+            **self.score_distribution(course, learning_outcome),
+            'applied_filters': {'course': course, 'learning_outcome': learning_outcome},
+            'ignored_filters': [name for name, value in
+                                (('subject', subject), ('date_from', date_from), ('date_to', date_to))
+                                if value is not None]
+        }
+        
+        analysis['filters'] = {
+            'course': course,
+            'subject': subject,
+            'learning_outcome': learning_outcome,
+            'date_from': date_from,
+            'date_to': date_to
+        }
+        
         return analysis
     
     def group_students_by_performance(self, n_clusters=3):
@@ -480,16 +1809,15 @@ class LOAnalyzer:
         Returns:
             dict: Complete student performance report
         """
+        # Get student's raw data
+        student_tasks = self._student_scores(student_id)
+        
         # Get student name
-        student_name = self.data[self.data['student_id'] == student_id]['student_name'].iloc[0]
+        student_name = student_tasks['student_name'].iloc[0]
         
         # Get predictions
         predictions = self.predict_student_lo_achievement(student_id)
         
-        # Get student's raw data
-        student_tasks = self.data[self.data['student_id'] == student_id].copy()
-        student_tasks['percentage_score'] = (student_tasks['score'] / student_tasks['total_score']) * 100
-        
         report = {
             'student_info': {
                 'student_id': student_id,
@@ -503,9 +1831,11 @@ class LOAnalyzer:
                 'tasks_above_threshold': int((student_tasks['percentage_score'] >= self.achievement_threshold).sum())
             },
             'lo_predictions': predictions,
-            'recent_performance': student_tasks.nlargest(5, 'date_submitted')[
+            'percentile_ranks': self.percentile_ranks(student_id),
+            'recent_performance': frame_to_records(
+                student_tasks.nlargest(5, 'date_submitted'),
                 ['task_title', 'percentage_score', 'date_submitted', 'learning_outcomes']
-            ].to_dict('records'),
+            ),
             'improvement_areas': self._identify_improvement_areas(predictions),
             'generated_at': datetime.now().isoformat()
         }
@@ -520,7 +1850,7 @@ class LOAnalyzer:
             if data['current_achievement_rate'] < 0.7 or data['ensemble_probability'] < 0.6:
                 improvement_areas.append({
                     'learning_outcome': lo,
-                    'description': self.curriculum_mapping[lo]['description'],
+                    'description': self.lo_description(lo),
                     'current_rate': data['current_achievement_rate'],
                     'predicted_probability': data['ensemble_probability'],
                     'priority': 'High' if data['ensemble_probability'] < 0.4 else 'Medium'
@@ -586,7 +1916,7 @@ def main():
         }
         
         with open('lo_analysis_results.json', 'w') as f:
-            json.dump(results, f, indent=2, default=str)
+            json.dump(results, f, indent=2, default=to_builtin)
         
         print("\n✅ Analysis complete! Results saved to 'lo_analysis_results.json'")
         print("🔗 Ready for Flask API integration")
@@ -0,0 +1,529 @@
+"""
+LO Analyzer Batch CLI
+=====================
+
+Offline batch runs of the full LOAnalyzer pipeline for nightly jobs, backfills
+and benchmarks, independent of the Flask API.
+
+Usage (from the repository root):
+    python python/lo_cli.py ingest new_scores.csv more_scores.ndjson
+    python python/lo_cli.py train
+    python python/lo_cli.py score-all --workers 8
+    python python/lo_cli.py cluster --clusters 4
+    python python/lo_cli.py export --format parquet
+    python python/lo_cli.py publish /var/lib/plp/shared-state
+    python python/lo_cli.py bench --students 100000
+
+Artifacts are written below --out (default: python/artifacts):
+    models.joblib                   Trained models (train; reused by the other commands)
+    predictions/part-00000.ndjson   Per-(student, LO) predictions, sharded by student (score-all)
+    reports/part-00000.ndjson       One full student report per line (score-all)
+    clusters.json                   Performance groups (cluster)
+    summary/, roster/               Student-LO summary and roster shards (export)
+    class_analysis.json             Class analytics and score distributions (export)
+    bench.json                      Stage timings (bench)
+    manifest.json                   Data/model versions, row counts and files per artifact
+
+Shards hold a fixed number of students each, so a student's rows never span
+two files. Tables can be written as Parquet when pyarrow is installed;
+reports are always NDJSON.
+
+Author: PLP Academic Management System
+Version: 1.0
+Purpose: Capstone Project - Smart Academic Management System
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from lo_analyzer import LOAnalyzer, SCORE_COLUMNS, data_file_lock
+from serialization import dumps, frame_to_records
+from shared_state import SharedStateReader
+
+DEFAULT_DATA_FILE = os.environ.get('PLP_DATA_FILE', 'python/student_scores.csv')
+DEFAULT_OUT_DIR = 'python/artifacts'
+
+# Students per output shard
+DEFAULT_SHARD_SIZE = 5000
+
+# Analyzer shared with forked score-all workers
+_analyzer = None
+
+
+def _model_path(args):
+    """Model file used by this run"""
+    return args.models or os.path.join(args.out, 'models.joblib')
+
+
+def _build_analyzer(args, with_models=True):
+    """
+    Load and preprocess the scores; load saved models or train new ones
+
+    Args:
+        args (argparse.Namespace): Parsed command-line options
+        with_models (bool): Whether the command needs trained models
+
+    Returns:
+        LOAnalyzer: Ready analyzer
+    """
+    analyzer = LOAnalyzer(csv_path=args.data, achievement_threshold=args.threshold)
+    analyzer.preprocess_data()
+
+    if with_models:
+        model_path = _model_path(args)
+        if os.path.exists(model_path):
+            analyzer.load_models(model_path)
+        else:
+            print(f"⚠️ No saved models at {model_path}, training new ones")
+            analyzer.train_models()
+
+    return analyzer
+
+
+def _read_score_file(path):
+    """Read a score batch from CSV, a JSON array or NDJSON"""
+    if path.endswith('.ndjson') or path.endswith('.jsonl'):
+        return pd.read_json(path, lines=True, dtype=False)
+    if path.endswith('.json'):
+        return pd.read_json(path, dtype=False)
+    return pd.read_csv(path)
+
+
+def _shard_bounds(student_ids, shard_size):
+    """Row ranges of a student_id-sorted table, shard_size students per range"""
+    student_ids = np.asarray(student_ids)
+    if not len(student_ids):
+        return []
+    starts = np.flatnonzero(np.r_[True, student_ids[1:] != student_ids[:-1]])
+    cuts = np.r_[starts[::shard_size], len(student_ids)]
+    return list(zip(cuts[:-1].tolist(), cuts[1:].tolist()))
+
+
+def _write_frame(frame, path, fmt):
+    """Write one table shard as NDJSON or Parquet"""
+    if fmt == 'parquet':
+        frame.to_parquet(path, index=False)
+    else:
+        with open(path, 'wb') as f:
+            for record in frame_to_records(frame):
+                f.write(dumps(record))
+                f.write(b'\n')
+
+
+def _replace_directory(staging, target):
+    """Swap a fully written staging directory into place"""
+    if os.path.isdir(target):
+        shutil.rmtree(target)
+    os.replace(staging, target)
+
+
+def _write_table(frame, directory, fmt, shard_size):
+    """
+    Write a student_id-sorted table as sharded files
+
+    Shards are written to a staging directory first, so readers never see a
+    half-written mix of old and new shards.
+
+    Returns:
+        dict: Manifest entry (format, rows, files)
+    """
+    staging = directory + '.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+
+    files = []
+    for shard, (start, stop) in enumerate(_shard_bounds(frame['student_id'], shard_size)):
+        name = f'part-{shard:05d}.{fmt}'
+        _write_frame(frame.iloc[start:stop], os.path.join(staging, name), fmt)
+        files.append(name)
+
+    _replace_directory(staging, directory)
+    return {'format': fmt, 'rows': int(len(frame)), 'files': files}
+
+
+def _write_json(payload, path):
+    """Write a compact JSON document"""
+    with open(path, 'wb') as f:
+        f.write(dumps(payload))
+
+
+def _update_manifest(args, analyzer, artifacts):
+    """Record versions and the written artifacts in manifest.json"""
+    path = os.path.join(args.out, 'manifest.json')
+    manifest = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            manifest = json.load(f)
+
+    manifest.update({
+        'data_file': os.path.abspath(args.data),
+        'data_version': analyzer.data_version,
+        'records': int(len(analyzer.data)),
+        'students': int(analyzer.data['student_id'].nunique()),
+        'updated_at': datetime.now().isoformat()
+    })
+    if analyzer.models:
+        manifest['model_version'] = analyzer.model_version
+    manifest.setdefault('artifacts', {}).update(artifacts)
+    _write_json(manifest, path)
+
+
+def _write_report_shard(task):
+    """score-all worker: write the reports of one student shard"""
+    path, student_ids = task
+    with open(path, 'wb') as f:
+        for student_id in student_ids:
+            f.write(dumps(_analyzer.generate_student_report(student_id)))
+            f.write(b'\n')
+    return len(student_ids)
+
+
+def cmd_ingest(args):
+    """Upsert score batches into the data file, retraining only if the policy asks for it"""
+    model_path = _model_path(args)
+    # Without saved models _build_analyzer trains new ones, which must be kept too
+    retrained = not os.path.exists(model_path)
+    analyzer = _build_analyzer(args)
+    batches = [(path, _read_score_file(path)) for path in args.files]
+
+    totals = {'received': 0, 'inserted': 0, 'updated': 0, 'unchanged': 0, 'rejected': 0}
+    # The API may be updating the same file; merge into its latest contents
+    with data_file_lock(args.data):
+        if analyzer.data_file_changed():
+            retrained |= analyzer.reload_data()['retrain']
+
+        for path, scores in batches:
+            decision = analyzer.ingest_scores(scores, force_retrain=args.force_retrain)
+            batch = decision['batch']
+            for key in totals:
+                totals[key] += batch[key]
+            retrained |= decision['retrain']
+            print(f"📥 {path}: {batch['inserted']} inserted, {batch['updated']} updated, "
+                  f"{batch['unchanged']} unchanged, {batch['rejected']} rejected")
+            for error in batch['errors'][:10]:
+                print(f"   row {error['row']}: {'; '.join(error['errors'])}")
+
+        if totals['inserted'] or totals['updated']:
+            analyzer.save_data(args.data)
+            print(f"💾 Wrote {len(analyzer.data)} records to {args.data}")
+    if retrained or totals['inserted'] or totals['updated']:
+        os.makedirs(args.out, exist_ok=True)
+        artifacts = {}
+        if retrained:
+            analyzer.save_models(model_path)
+            artifacts['models'] = {'format': 'joblib', 'files': [os.path.basename(model_path)]}
+        _update_manifest(args, analyzer, artifacts)
+
+    print(dumps({'batches': len(args.files), **totals, 'retrained': retrained,
+                 'data_version': analyzer.data_version,
+                 'model_version': analyzer.model_version}).decode('utf-8'))
+
+
+def cmd_train(args):
+    """Train the models on the full data set and save them"""
+    analyzer = _build_analyzer(args, with_models=False)
+    analyzer.train_models()
+
+    os.makedirs(args.out, exist_ok=True)
+    model_path = _model_path(args)
+    analyzer.save_models(model_path)
+    _update_manifest(args, analyzer, {'models': {'format': 'joblib', 'files': [os.path.basename(model_path)]}})
+
+
+def cmd_score_all(args):
+    """Score every student and write prediction and report shards"""
+    global _analyzer
+
+    analyzer = _build_analyzer(args)
+    os.makedirs(args.out, exist_ok=True)
+
+    started = time.perf_counter()
+    predictions = analyzer.predictions.reset_index(drop=True)
+    artifacts = {
+        'predictions': _write_table(predictions, os.path.join(args.out, 'predictions'),
+                                    args.format, args.shard_size)
+    }
+    print(f"🧮 Wrote {len(predictions)} predictions in {time.perf_counter() - started:.2f}s")
+
+    if not args.no_reports:
+        started = time.perf_counter()
+        student_ids = analyzer.roster['student_id'].tolist()
+        directory = os.path.join(args.out, 'reports')
+        staging = directory + '.tmp'
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        tasks = [
+            (os.path.join(staging, f'part-{shard:05d}.ndjson'), student_ids[start:start + args.shard_size])
+            for shard, start in enumerate(range(0, len(student_ids), args.shard_size))
+        ]
+
+        # Forked workers share the analyzer copy-on-write instead of pickling it
+        _analyzer = analyzer
+        if args.workers > 1 and len(tasks) > 1 and 'fork' in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=args.workers, mp_context=context) as pool:
+                written = sum(pool.map(_write_report_shard, tasks))
+        else:
+            written = sum(map(_write_report_shard, tasks))
+
+        _replace_directory(staging, directory)
+        artifacts['reports'] = {'format': 'ndjson', 'rows': written,
+                                'files': [os.path.basename(path) for path, _ in tasks]}
+        print(f"📝 Wrote {written} student reports in {time.perf_counter() - started:.2f}s")
+
+    _update_manifest(args, analyzer, artifacts)
+
+
+def cmd_cluster(args):
+    """Group students by performance and write the groups"""
+    analyzer = _build_analyzer(args, with_models=False)
+    os.makedirs(args.out, exist_ok=True)
+
+    groups = analyzer.group_students_by_performance(n_clusters=args.clusters)
+    _write_json({'n_clusters': args.clusters, 'groups': groups,
+                 'generated_at': datetime.now().isoformat()},
+                os.path.join(args.out, 'clusters.json'))
+
+    for name, group in groups.items():
+        print(f"👥 {name}: {group['student_count']} students - {group['characteristics']}")
+    _update_manifest(args, analyzer, {'clusters': {'format': 'json', 'rows': len(groups),
+                                                   'files': ['clusters.json']}})
+
+
+def cmd_export(args):
+    """Write the student-LO summary, roster and class analytics"""
+    analyzer = _build_analyzer(args, with_models=False)
+    os.makedirs(args.out, exist_ok=True)
+
+    artifacts = {
+        'summary': _write_table(analyzer.student_lo_summary, os.path.join(args.out, 'summary'),
+                                args.format, args.shard_size),
+        'roster': _write_table(analyzer.roster, os.path.join(args.out, 'roster'),
+                               args.format, args.shard_size)
+    }
+
+    _write_json({
+        'class_analysis': analyzer.analyze_class_performance(),
+        'score_distributions': {
+            'learning_outcome': {lo: analyzer.score_distribution(learning_outcome=lo)
+                                 for lo in sorted(analyzer.score_sketches['learning_outcome'])},
+            'course': {course: analyzer.score_distribution(course=course)
+                       for course in sorted(analyzer.score_sketches['course'])}
+        },
+        'generated_at': datetime.now().isoformat()
+    }, os.path.join(args.out, 'class_analysis.json'))
+    artifacts['class_analysis'] = {'format': 'json', 'files': ['class_analysis.json']}
+
+    print(f"📤 Exported {artifacts['summary']['rows']} summary rows and "
+          f"{artifacts['roster']['rows']} roster rows")
+    _update_manifest(args, analyzer, artifacts)
+
+
+def cmd_publish(args):
+    """Publish a new shared state version for running API workers"""
+    analyzer = _build_analyzer(args)
+    version = analyzer.publish_shared_state(args.directory)
+    print(dumps({'directory': os.path.abspath(args.directory), 'version': version,
+                 'data_version': analyzer.data_version,
+                 'model_version': analyzer.model_version}).decode('utf-8'))
+
+
+def synthetic_scores(n_students, tasks_per_student=12, seed=0):
+    """
+    Generate a realistic-looking score table for benchmarks
+
+    Args:
+        n_students (int): Number of students
+        tasks_per_student (int): Tasks submitted by every student
+        seed (int): Random seed
+
+    Returns:
+        pd.DataFrame: Score records with SCORE_COLUMNS
+    """
+    rng = np.random.default_rng(seed)
+    tasks = [
+        ('Course Orientation Essay', 'LO1', 'Course Orientation and Capstone Overview'),
+        ('Problem Identification Lab', 'LO1', 'Identifying Real-World Problems'),
+        ('Literature Review Draft', 'LO2', 'Review of Related Literature and Studies'),
+        ('Project Title Proposal', 'LO1;LO3', 'Project Title and Objectives'),
+        ('Scope and Delimitation Paper', 'LO3', 'Defining Scope Delimitation and Significance'),
+        ('Methodology Outline', 'LO4', 'Methodology and System Design Overview'),
+        ('Consultation Log', 'LO1;LO2;LO3;LO4', 'Consultation and Proposal Refinement'),
+        ('System Prototype', 'LO4', 'System Development Phase'),
+        ('Final Proposal Defense', 'LO3;LO4', 'Final Proposal Submission and Presentation'),
+    ]
+
+    student_ids = np.repeat(np.arange(1, n_students + 1), tasks_per_student)
+    task_ids = np.tile(np.arange(1, tasks_per_student + 1), n_students)
+    task_kind = (task_ids - 1) % len(tasks)
+
+    # Each student has an ability level; task scores scatter around it
+    ability = rng.normal(76, 10, n_students)
+    scores = np.clip(np.repeat(ability, tasks_per_student) + rng.normal(0, 9, len(student_ids)), 0, 100)
+
+    sections = np.array(['BSIT3A', 'BSIT3B', 'BSIT3C', 'BSCS3A'])
+    courses = np.array(['Capstone 1', 'Capstone 2'])
+    start = datetime(2025, 1, 15)
+    dates = np.array([(start + timedelta(weeks=int(week))).date().isoformat()
+                      for week in range(tasks_per_student)])
+
+    return pd.DataFrame({
+        'student_id': student_ids,
+        'student_name': np.char.add('Student ', student_ids.astype(str)),
+        'course': courses[(student_ids // 2) % len(courses)],
+        'subject': sections[student_ids % len(sections)],
+        'task_id': task_ids,
+        'task_title': [f'{tasks[k][0]} {t}' for k, t in zip(task_kind, task_ids)],
+        'score': scores.round().astype(int),
+        'total_score': 100,
+        'date_submitted': dates[task_ids - 1],
+        'learning_outcomes': [tasks[k][1] for k in task_kind],
+        'topic': [tasks[k][2] for k in task_kind]
+    })[SCORE_COLUMNS]
+
+
+def cmd_bench(args):
+    """Time the pipeline stages on the data file or on synthetic data"""
+    stages = {}
+
+    def timed(name, func, *func_args, **func_kwargs):
+        started = time.perf_counter()
+        result = func(*func_args, **func_kwargs)
+        stages[name] = round((time.perf_counter() - started) * 1000, 2)
+        print(f"⏱️ {name:<28} {stages[name]:>12.2f} ms")
+        return result
+
+    data_file = args.data
+    tmp_dir = None
+    if args.students:
+        tmp_dir = tempfile.mkdtemp(prefix='plp-bench-')
+        data_file = os.path.join(tmp_dir, 'scores.csv')
+        timed('generate_synthetic', lambda: synthetic_scores(
+            args.students, args.tasks_per_student).to_csv(data_file, index=False))
+
+    try:
+        analyzer = timed('load', LOAnalyzer, csv_path=data_file, achievement_threshold=args.threshold)
+        timed('preprocess', analyzer.preprocess_data)
+        timed('train', analyzer.train_models)
+        timed('score_all', analyzer.refresh_predictions)
+        timed('class_analysis', analyzer.analyze_class_performance)
+        timed('group_students', analyzer.group_students_by_performance)
+        timed('query_roster', analyzer.query_roster, sort_by='avg_percentage', order='desc', limit=50)
+
+        student_ids = analyzer.roster['student_id'].to_numpy()
+        sample = np.random.default_rng(0).choice(student_ids, min(args.samples, len(student_ids)), replace=False)
+        timed(f'reports_x{len(sample)}', lambda: [analyzer.generate_student_report(s) for s in sample.tolist()])
+        timed('similar_students_x1000', lambda: [analyzer.similar_students(s, 10)
+                                                 for s in np.resize(sample, 1000).tolist()])
+        state_dir = tempfile.mkdtemp(prefix='plp-bench-state-', dir=tmp_dir)
+        timed('publish_shared_state', analyzer.publish_shared_state, state_dir)
+        state = SharedStateReader(state_dir).current()
+        timed('shared_predictions_x1000', lambda: [analyzer.format_predictions(state.student_rows(s))
+                                                   for s in np.resize(sample, 1000).tolist()])
+        if not tmp_dir:
+            shutil.rmtree(state_dir, ignore_errors=True)
+        timed('topic_batch_x1000', analyzer.rank_los_for_topics,
+              [(f'System Design Review {i}', None) for i in range(1000)])
+
+        updates = analyzer.data[SCORE_COLUMNS].sample(min(1000, len(analyzer.data)), random_state=0)
+        updates = updates.assign(score=(updates['score'] + 1).clip(upper=updates['total_score']))
+        timed(f'ingest_updates_x{len(updates)}', analyzer.ingest_scores, updates)
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    results = {
+        'data_file': 'synthetic' if args.students else os.path.abspath(args.data),
+        'records': int(len(analyzer.data)),
+        'students': int(len(analyzer.roster)),
+        'stages_ms': stages,
+        'generated_at': datetime.now().isoformat()
+    }
+
+    if args.url:
+        from bench_api import run_benchmark
+        print(f"🏁 Benchmarking {args.url} for {args.duration:.0f}s...")
+        results['api'] = run_benchmark(args.url, args.concurrency, args.duration)
+
+    os.makedirs(args.out, exist_ok=True)
+    _write_json(results, os.path.join(args.out, 'bench.json'))
+    print(dumps(results).decode('utf-8'))
+
+
+def build_parser():
+    """Argument parser with one subcommand per batch job"""
+    parser = argparse.ArgumentParser(description='Batch jobs for the Learning Outcomes Analyzer')
+    parser.add_argument('--data', default=DEFAULT_DATA_FILE, help='Scores CSV (default: %(default)s)')
+    parser.add_argument('--out', default=DEFAULT_OUT_DIR, help='Artifact directory (default: %(default)s)')
+    parser.add_argument('--models', help='Model file (default: <out>/models.joblib)')
+    parser.add_argument('--threshold', type=float, default=70, help='LO achievement threshold in percent')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest = commands.add_parser('ingest', help='Upsert score batches (CSV, JSON or NDJSON) into the data file')
+    ingest.add_argument('files', nargs='+', help='Score batch files')
+    ingest.add_argument('--force-retrain', action='store_true', help='Retrain regardless of the policy')
+    ingest.set_defaults(func=cmd_ingest)
+
+    train = commands.add_parser('train', help='Train and save the models')
+    train.set_defaults(func=cmd_train)
+
+    table_formats = ['ndjson', 'parquet']
+
+    score_all = commands.add_parser('score-all', help='Write predictions and reports for every student')
+    score_all.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Report worker processes')
+    score_all.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE, help='Students per shard')
+    score_all.add_argument('--format', choices=table_formats, default='ndjson', help='Prediction table format')
+    score_all.add_argument('--no-reports', action='store_true', help='Only write the predictions table')
+    score_all.set_defaults(func=cmd_score_all)
+
+    cluster = commands.add_parser('cluster', help='Group students by performance')
+    cluster.add_argument('--clusters', type=int, default=3, help='Number of groups')
+    cluster.set_defaults(func=cmd_cluster)
+
+    export = commands.add_parser('export', help='Write summary, roster and class analytics')
+    export.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE, help='Students per shard')
+    export.add_argument('--format', choices=table_formats, default='ndjson', help='Table format')
+    export.set_defaults(func=cmd_export)
+
+    publish = commands.add_parser('publish', help='Publish memory-mapped predictions for the API workers')
+    publish.add_argument('directory', help='Shared state directory (the API\'s PLP_SHARED_STATE_DIR)')
+    publish.set_defaults(func=cmd_publish)
+
+    bench = commands.add_parser('bench', help='Time the pipeline stages')
+    bench.add_argument('--students', type=int, default=0, help='Benchmark on N synthetic students instead of --data')
+    bench.add_argument('--tasks-per-student', type=int, default=12, help='Tasks per synthetic student')
+    bench.add_argument('--samples', type=int, default=100, help='Student reports to time')
+    bench.add_argument('--url', help='Also load-test a running API at this URL')
+    bench.add_argument('--concurrency', type=int, default=8, help='API benchmark clients')
+    bench.add_argument('--duration', type=float, default=10.0, help='API benchmark duration in seconds')
+    bench.set_defaults(func=cmd_bench)
+
+    return parser
+
+
+def main(argv=None):
+    """Command-line entry point"""
+    args = build_parser().parse_args(argv)
+
+    if getattr(args, 'format', None) == 'parquet':
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            build_parser().error('--format parquet requires pyarrow (pip install pyarrow)')
+
+    args.func(args)
+
+
+if __name__ == '__main__':
+    main()
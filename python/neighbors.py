@@ -0,0 +1,156 @@
+"""
+Similar Students Index
+======================
+
+Nearest-neighbour search over per-LO performance vectors, used to pair
+students with peers who perform alike (e.g. for peer tutoring).
+
+Every student is one row of a float32 matrix pivoted from the analyzer's
+student_lo_summary: the average score (as a 0-1 fraction) and achievement
+rate for each LO. LOs a student has no records for are filled with the LO's
+mean at build time. Queries are a vectorized brute-force scan, computing
+||x - q||^2 = ||x||^2 - 2 x.q + ||q||^2 with one matrix-vector product and
+selecting the top k with argpartition. With only a handful of LOs the
+vectors are short, so a scan of 100k students takes about a millisecond
+and needs no tree to maintain.
+
+When scores are ingested, only the touched students' rows are recomputed.
+
+Author: PLP Academic Management System
+Version: 1.0
+Purpose: Capstone Project - Smart Academic Management System
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Per-LO features of a student vector, each scaled to 0-1
+VECTOR_FEATURES = ['avg_score', 'achievement_rate']
+
+MAX_NEIGHBORS = 100
+
+
+class StudentSimilarityIndex:
+    """Student x LO feature matrix with top-k nearest-neighbour queries"""
+
+    def __init__(self):
+        """Initialize an empty index"""
+        self.learning_outcomes = []
+        self.student_ids = np.empty(0, dtype=np.int64)
+        self.matrix = np.empty((0, 0), dtype=np.float32)
+        self._sq_norms = np.empty(0, dtype=np.float32)
+        self._fill = np.empty(0, dtype=np.float32)
+        self._lock = threading.Lock()
+
+    def _vectors(self, summary, learning_outcomes, fill=None):
+        """
+        Pivot student_lo_summary rows into one float32 vector per student
+
+        Returns:
+            tuple: (sorted student IDs, matrix, per-column fill values)
+        """
+        pivot = summary.set_index(['student_id', 'learning_outcome'])[VECTOR_FEATURES].unstack()
+        columns = pd.MultiIndex.from_product([VECTOR_FEATURES, learning_outcomes])
+        pivot = pivot.reindex(columns=columns).sort_index()
+
+        matrix = pivot.to_numpy(dtype=np.float32, copy=True)
+        # avg_score is a percentage; bring it to the same 0-1 scale as achievement_rate
+        matrix[:, :len(learning_outcomes)] /= 100
+
+        if fill is None:
+            fill = np.nan_to_num(np.nanmean(matrix, axis=0)) if len(matrix) else np.zeros(matrix.shape[1])
+            fill = fill.astype(np.float32)
+        missing = np.isnan(matrix)
+        matrix[missing] = np.take(fill, np.nonzero(missing)[1])
+
+        return pivot.index.to_numpy(dtype=np.int64), matrix, fill
+
+    def build(self, summary):
+        """
+        Rebuild the index from scratch
+
+        Args:
+            summary (pd.DataFrame): student_lo_summary
+        """
+        learning_outcomes = sorted(summary['learning_outcome'].unique().tolist())
+        student_ids, matrix, fill = self._vectors(summary, learning_outcomes)
+
+        with self._lock:
+            self.learning_outcomes = learning_outcomes
+            self.student_ids = student_ids
+            self.matrix = matrix
+            self._sq_norms = np.einsum('ij,ij->i', matrix, matrix)
+            self._fill = fill
+
+    def update(self, summary, student_ids):
+        """
+        Recompute the vectors of some students
+
+        A new LO changes the vector layout, so it triggers a full rebuild.
+
+        Args:
+            summary (pd.DataFrame): Current student_lo_summary
+            student_ids (iterable): Students whose summary rows changed
+        """
+        rows = summary[summary['student_id'].isin(set(student_ids))]
+        if rows.empty:
+            return
+        if not set(rows['learning_outcome'].unique()) <= set(self.learning_outcomes):
+            self.build(summary)
+            return
+
+        updated_ids, vectors, _ = self._vectors(rows, self.learning_outcomes, self._fill)
+
+        with self._lock:
+            positions = np.searchsorted(self.student_ids, updated_ids)
+            known = positions < len(self.student_ids)
+            known[known] = self.student_ids[positions[known]] == updated_ids[known]
+
+            student_ids = np.concatenate([self.student_ids, updated_ids[~known]])
+            matrix = np.concatenate([self.matrix, vectors[~known]])
+            matrix[positions[known]] = vectors[known]
+
+            order = np.argsort(student_ids, kind='stable')
+            self.student_ids = student_ids[order]
+            self.matrix = matrix[order]
+            self._sq_norms = np.einsum('ij,ij->i', self.matrix, self.matrix)
+
+    def vector(self, student_id):
+        """A student's vector, or None if the student is not indexed"""
+        position = np.searchsorted(self.student_ids, student_id)
+        if position >= len(self.student_ids) or self.student_ids[position] != student_id:
+            return None
+        return self.matrix[position]
+
+    def query(self, student_id, k=10):
+        """
+        The k students closest to a student (the student itself excluded)
+
+        Args:
+            student_id (int): Student to find peers for
+            k (int): Number of neighbours
+
+        Returns:
+            tuple: (neighbour IDs, Euclidean distances), nearest first; None if
+                the student is not indexed
+        """
+        with self._lock:
+            student_ids, matrix, sq_norms = self.student_ids, self.matrix, self._sq_norms
+            query = self.vector(student_id)
+        if query is None:
+            return None
+
+        distances = sq_norms - 2 * (matrix @ query) + query @ query
+        candidates = student_ids != student_id
+        distances = np.where(candidates, np.maximum(distances, 0), np.inf)
+
+        k = min(k, int(candidates.sum()))
+        if k <= 0:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        nearest = np.argpartition(distances, k - 1)[:k]
+        # Ties are broken by student ID so results are stable
+        nearest = nearest[np.lexsort((student_ids[nearest], distances[nearest]))]
+
+        return student_ids[nearest], np.sqrt(distances[nearest])
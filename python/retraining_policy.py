@@ -0,0 +1,208 @@
+"""
+Retraining Policy
+=================
+
+Drift-triggered retraining decisions for the LOAnalyzer.
+
+Instead of retraining both models on every score upload, the policy keeps a
+snapshot of the per-(student, LO) feature distributions that the current
+models were trained on and only asks for a retrain when the data has moved
+far enough away from it.
+
+Author: PLP Academic Management System
+Version: 1.0
+Purpose: Capstone Project - Smart Academic Management System
+"""
+
+from datetime import datetime
+import numpy as np
+
+# Features of student_lo_summary the models are trained on
+DRIFT_FEATURES = ['avg_score', 'score_std', 'task_count']
+
+
+def population_stability_index(expected, actual, bins=10):
+    """
+    Population Stability Index between a baseline and a current sample
+
+    Bin edges are taken from the baseline quantiles so each bin starts out
+    with roughly the same share of the population.
+
+    Args:
+        expected (array-like): Baseline values (at training time)
+        actual (array-like): Current values
+        bins (int): Number of quantile bins
+
+    Returns:
+        float: PSI score (0 = identical, > 0.2 is usually considered a major shift)
+    """
+    expected = np.asarray(expected, dtype=float)
+    actual = np.asarray(actual, dtype=float)
+
+    if expected.size == 0 or actual.size == 0:
+        return 0.0
+
+    edges = np.unique(np.quantile(expected, np.linspace(0, 1, bins + 1)))
+    if edges.size < 2:
+        # Constant baseline: split into below / at / above the constant
+        edges = np.array([-np.inf, edges[0], np.nextafter(edges[0], np.inf), np.inf])
+    else:
+        # Open the outer bins so values outside the baseline range are counted
+        edges = edges.astype(float)
+        edges[0], edges[-1] = -np.inf, np.inf
+
+    expected_pct = np.histogram(expected, edges)[0] / expected.size
+    actual_pct = np.histogram(actual, edges)[0] / actual.size
+
+    # Avoid log(0) for empty bins
+    expected_pct = np.clip(expected_pct, 1e-4, None)
+    actual_pct = np.clip(actual_pct, 1e-4, None)
+
+    return float(np.sum((actual_pct - expected_pct) * np.log(actual_pct / expected_pct)))
+
+
+class RetrainingPolicy:
+    """
+    Decide whether the LO models need retraining after new data arrives
+
+    A retrain is triggered when any of the following is true:
+    - No model has been trained yet
+    - A Learning Outcome appears that the models have never seen
+    - The trained version is older than the maximum staleness
+    - The number of score records grew (or shrank) by more than the row delta
+    - A feature's PSI drift score exceeds the PSI threshold
+    - An LO's mean achievement rate moved by more than the achievement shift
+    """
+
+    def __init__(self, psi_threshold=0.2, achievement_shift_threshold=0.1,
+                 row_delta_ratio=0.25, max_staleness_hours=24 * 7):
+        """
+        Initialize the RetrainingPolicy
+
+        Args:
+            psi_threshold (float): Maximum tolerated PSI for any feature
+            achievement_shift_threshold (float): Maximum tolerated change in an LO's mean achievement rate
+            row_delta_ratio (float): Maximum tolerated relative change in score record count
+            max_staleness_hours (float): Maximum age of the trained models in hours
+        """
+        self.psi_threshold = psi_threshold
+        self.achievement_shift_threshold = achievement_shift_threshold
+        self.row_delta_ratio = row_delta_ratio
+        self.max_staleness_hours = max_staleness_hours
+
+    def snapshot(self, student_lo_summary, total_rows):
+        """
+        Capture the training-time distribution used as the drift baseline
+
+        Args:
+            student_lo_summary (pd.DataFrame): Per-(student, LO) features the models were trained on
+            total_rows (int): Number of raw score records at training time
+
+        Returns:
+            dict: Baseline snapshot
+        """
+        return {
+            'trained_at': datetime.now(),
+            'total_rows': int(total_rows),
+            'features': {
+                feature: student_lo_summary[feature].to_numpy(dtype=float).copy()
+                for feature in DRIFT_FEATURES
+            },
+            'lo_stats': self._lo_stats(student_lo_summary)
+        }
+
+    def evaluate(self, baseline, student_lo_summary, total_rows, now=None):
+        """
+        Compare the current data against the training baseline
+
+        Args:
+            baseline (dict): Snapshot returned by snapshot(), or None if never trained
+            student_lo_summary (pd.DataFrame): Current per-(student, LO) features
+            total_rows (int): Current number of raw score records
+            now (datetime, optional): Evaluation time (default: now)
+
+        Returns:
+            dict: Decision with 'retrain', 'reason', all fired 'triggers' and the drift 'metrics'
+        """
+        now = now or datetime.now()
+
+        if baseline is None:
+            return self._decision(['no_trained_model'], {}, now)
+
+        triggers = []
+
+        # Learning Outcomes unknown to the label encoder can't be scored at all
+        current_lo_stats = self._lo_stats(student_lo_summary)
+        new_los = sorted(set(current_lo_stats) - set(baseline['lo_stats']))
+        if new_los:
+            triggers.append('new_learning_outcome')
+
+        age_hours = (now - baseline['trained_at']).total_seconds() / 3600
+        if age_hours > self.max_staleness_hours:
+            triggers.append('max_staleness')
+
+        row_delta = abs(int(total_rows) - baseline['total_rows']) / max(baseline['total_rows'], 1)
+        if row_delta > self.row_delta_ratio:
+            triggers.append('row_count_delta')
+
+        psi = {
+            feature: round(population_stability_index(
+                baseline['features'][feature],
+                student_lo_summary[feature].to_numpy(dtype=float)
+            ), 4)
+            for feature in DRIFT_FEATURES
+        }
+        if max(psi.values()) > self.psi_threshold:
+            triggers.append('feature_drift')
+
+        achievement_shift = {
+            lo: round(abs(stats['achievement_rate'] - baseline['lo_stats'][lo]['achievement_rate']), 4)
+            for lo, stats in current_lo_stats.items()
+            if lo in baseline['lo_stats']
+        }
+        if achievement_shift and max(achievement_shift.values()) > self.achievement_shift_threshold:
+            triggers.append('achievement_shift')
+
+        metrics = {
+            'model_age_hours': round(age_hours, 2),
+            'row_delta_ratio': round(row_delta, 4),
+            'psi': psi,
+            'achievement_shift': achievement_shift,
+            'new_learning_outcomes': new_los,
+            'lo_stats': current_lo_stats
+        }
+
+        return self._decision(triggers, metrics, now)
+
+    def _decision(self, triggers, metrics, now):
+        """Build the decision dictionary reported to callers"""
+        return {
+            'retrain': bool(triggers),
+            'reason': triggers[0] if triggers else 'within_thresholds',
+            'triggers': triggers,
+            'metrics': metrics,
+            'thresholds': {
+                'psi': self.psi_threshold,
+                'achievement_shift': self.achievement_shift_threshold,
+                'row_delta_ratio': self.row_delta_ratio,
+                'max_staleness_hours': self.max_staleness_hours
+            },
+            'evaluated_at': now.isoformat()
+        }
+
+    @staticmethod
+    def _lo_stats(student_lo_summary):
+        """Per-LO counts and means of the training features"""
+        grouped = student_lo_summary.groupby('learning_outcome').agg(
+            count=('student_id', 'size'),
+            avg_score=('avg_score', 'mean'),
+            achievement_rate=('achievement_rate', 'mean')
+        )
+        return {
+            lo: {
+                'count': int(row['count']),
+                'avg_score': round(float(row['avg_score']), 3),
+                'achievement_rate': round(float(row['achievement_rate']), 4)
+            }
+            for lo, row in grouped.iterrows()
+        }
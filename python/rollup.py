@@ -0,0 +1,236 @@
+"""
+Class Analytics Rollup Cube
+===========================
+
+Pre-aggregated, mergeable score statistics at (course, subject, LO, ISO week)
+granularity for the LOAnalyzer's class analytics.
+
+Each cell holds a count, sum, sum of squares and achieved count, so cells can
+be added (new scores) and subtracted (replaced scores) without revisiting
+row-level data, and any slice can be answered by summing its cells.
+
+Exact distinct student and task counts need each cell's members, so every
+cell also keeps a multiset of integer member codes as a pair of numpy
+arrays (sorted codes, record counts) that can be merged and subtracted the
+same way. Membership is still one entry per distinct (cell, student) and
+(cell, task) pair, but at 16 bytes each. A slice's distinct count is a
+hash-based unique over the concatenated code arrays of its cells.
+
+Author: PLP Academic Management System
+Version: 1.0
+Purpose: Capstone Project - Smart Academic Management System
+"""
+
+import numpy as np
+import pandas as pd
+
+CUBE_DIMENSIONS = ['course', 'subject', 'learning_outcome', 'week']
+CUBE_MEASURES = ['count', 'sum', 'sumsq', 'achieved']
+
+
+def week_start(dates):
+    """Monday of the ISO week of each date (NaT stays NaT)"""
+    dates = pd.to_datetime(dates)
+    return (dates - pd.to_timedelta(dates.dt.weekday, unit='D')).dt.normalize()
+
+
+class RollupCube:
+    """
+    Mergeable aggregates of LO-level score records
+
+    Rows passed to add()/remove() are processed LO records with the columns
+    course, subject, learning_outcome, date_submitted, percentage_score,
+    achieved, student_id and task_title.
+    """
+
+    def __init__(self):
+        """Initialize an empty cube"""
+        self.cells = pd.DataFrame(
+            columns=CUBE_MEASURES,
+            index=pd.MultiIndex.from_arrays([[]] * len(CUBE_DIMENSIONS), names=CUBE_DIMENSIONS),
+            dtype=float
+        )
+        # cell -> (sorted member codes, record counts)
+        self._students = {}
+        self._tasks = {}
+        # task_title -> integer code used in the task membership arrays
+        self._task_codes = {}
+
+    def add(self, rows):
+        """Merge processed LO records into the cube"""
+        self._merge(rows, 1)
+
+    def remove(self, rows):
+        """Subtract processed LO records that were previously added"""
+        self._merge(rows, -1)
+
+    def _merge(self, rows, sign):
+        """Aggregate rows into cells and add them (sign=1) or subtract them (sign=-1)"""
+        if rows is None or len(rows) == 0:
+            return
+
+        keyed = pd.DataFrame({
+            'course': rows['course'].to_numpy(),
+            'subject': rows['subject'].to_numpy(),
+            'learning_outcome': rows['learning_outcome'].to_numpy(),
+            'week': week_start(rows['date_submitted']).to_numpy(),
+            'score': rows['percentage_score'].to_numpy(dtype=float),
+            'achieved': rows['achieved'].to_numpy(dtype=float),
+            'student_id': rows['student_id'].to_numpy(dtype=np.int64),
+            'task_title': self._encode_tasks(rows['task_title'].to_numpy())
+        })
+        keyed['sq'] = keyed['score'] ** 2
+
+        delta = keyed.groupby(CUBE_DIMENSIONS, dropna=False).agg(
+            count=('score', 'size'),
+            sum=('score', 'sum'),
+            sumsq=('sq', 'sum'),
+            achieved=('achieved', 'sum')
+        ).astype(float)
+
+        cells = self.cells.add(delta * sign, fill_value=0)
+        self.cells = cells[cells['count'] > 0].sort_index()
+
+        for column, members in (('student_id', self._students), ('task_title', self._tasks)):
+            # Sorted by cell, then member: each cell's members are one contiguous, sorted run
+            pairs = keyed.groupby(CUBE_DIMENSIONS + [column], dropna=False).size()
+            index = pairs.index
+            all_codes = index.get_level_values(-1).to_numpy(dtype=np.int64)
+            all_counts = pairs.to_numpy(dtype=np.int64) * sign
+            cell_changes = np.zeros(len(pairs), dtype=bool)
+            cell_changes[:1] = True
+            for level_codes in index.codes[:-1]:
+                cell_changes[1:] |= level_codes[1:] != level_codes[:-1]
+            bounds = np.append(np.flatnonzero(cell_changes), len(pairs))
+
+            for start, stop in zip(bounds[:-1], bounds[1:]):
+                cell = index[start][:-1]
+                codes, counts = all_codes[start:stop], all_counts[start:stop]
+                previous = members.get(cell)
+                if previous is not None:
+                    # Existing members are updated in place; only new codes are spliced in
+                    known, known_counts = previous[0], previous[1].copy()
+                    position = np.searchsorted(known, codes)
+                    hit = position < len(known)
+                    hit[hit] = known[position[hit]] == codes[hit]
+                    known_counts[position[hit]] += counts[hit]
+                    codes = np.insert(known, position[~hit], codes[~hit])
+                    counts = np.insert(known_counts, position[~hit], counts[~hit])
+
+                keep = counts > 0
+                if keep.all():
+                    members[cell] = (codes, counts)
+                elif keep.any():
+                    members[cell] = (codes[keep], counts[keep])
+                else:
+                    members.pop(cell, None)
+
+    def _encode_tasks(self, titles):
+        """Integer codes of task titles, assigning new codes to unseen titles"""
+        for title in pd.unique(titles):
+            self._task_codes.setdefault(title, len(self._task_codes))
+        return np.fromiter((self._task_codes[title] for title in titles), dtype=np.int64, count=len(titles))
+
+    @staticmethod
+    def _distinct(members, keys):
+        """Distinct member codes over a set of cells"""
+        arrays = [members[key][0] for key in keys if key in members]
+        if not arrays:
+            return np.empty(0, dtype=np.int64)
+        return pd.unique(np.concatenate(arrays))
+
+    def query(self, course=None, subject=None, learning_outcome=None, date_from=None, date_to=None):
+        """
+        Aggregate the cells of a slice
+
+        Date bounds are applied at week granularity: a week is included when
+        its Monday falls within [week of date_from, week of date_to].
+
+        Args:
+            course (str, optional): Only this course
+            subject (str, optional): Only this subject/section
+            learning_outcome (str, optional): Only this LO
+            date_from (str or datetime, optional): First day of the range
+            date_to (str or datetime, optional): Last day of the range
+
+        Returns:
+            dict: 'overall', per-LO 'lo_performance', 'weekly_trend' and the slice's 'student_ids' (array)
+        """
+        cells = self.cells
+        mask = np.ones(len(cells), dtype=bool)
+
+        for level, value in (('course', course), ('subject', subject),
+                             ('learning_outcome', learning_outcome)):
+            if value is not None:
+                mask &= cells.index.get_level_values(level) == value
+
+        weeks = cells.index.get_level_values('week')
+        if date_from is not None:
+            mask &= weeks >= week_start(pd.Series([date_from]))[0]
+        if date_to is not None:
+            mask &= weeks <= week_start(pd.Series([date_to]))[0]
+
+        selected = cells[mask]
+        keys = list(selected.index)
+
+        students = self._distinct(self._students, keys)
+        tasks = self._distinct(self._tasks, keys)
+
+        totals = selected.sum()
+        overall = {
+            'total_students': len(students),
+            'total_tasks': len(tasks),
+            'overall_achievement_rate': self._round(self._ratio(totals['achieved'], totals['count'])),
+            'average_score': self._round(self._ratio(totals['sum'], totals['count']))
+        }
+
+        by_lo = selected.groupby(level='learning_outcome').sum()
+        lo_performance = {
+            lo: {
+                'achievement_rate': self._round(self._ratio(row['achieved'], row['count']), 3),
+                'total_attempts': int(row['count']),
+                'avg_score': self._round(self._ratio(row['sum'], row['count']), 3),
+                'score_std': self._round(self._std(row['count'], row['sum'], row['sumsq']), 3)
+            }
+            for lo, row in by_lo.iterrows()
+        }
+
+        by_week = selected.groupby(level='week').sum()
+        weekly_trend = [
+            {
+                'week_start': week.date().isoformat(),
+                'iso_week': f"{week.isocalendar()[0]}-W{week.isocalendar()[1]:02d}",
+                'attempts': int(row['count']),
+                'avg_score': self._round(self._ratio(row['sum'], row['count']), 3),
+                'achievement_rate': self._round(self._ratio(row['achieved'], row['count']), 3)
+            }
+            for week, row in by_week.iterrows() if not pd.isna(week)
+        ]
+
+        return {
+            'overall': overall,
+            'lo_performance': lo_performance,
+            'weekly_trend': weekly_trend,
+            'student_ids': students,
+            'cells_scanned': int(len(selected))
+        }
+
+    @staticmethod
+    def _round(value, digits=None):
+        """Round a statistic for output; undefined (NaN) statistics become None"""
+        if np.isnan(value):
+            return None
+        return value if digits is None else round(value, digits)
+
+    @staticmethod
+    def _ratio(numerator, denominator):
+        """numerator / denominator, NaN for empty slices"""
+        return float(numerator / denominator) if denominator else float('nan')
+
+    @staticmethod
+    def _std(count, total, sumsq):
+        """Sample standard deviation (ddof=1) from count, sum and sum of squares"""
+        if count < 2:
+            return float('nan')
+        variance = (sumsq - total * total / count) / (count - 1)
+        return float(np.sqrt(max(variance, 0.0)))
@@ -0,0 +1,245 @@
+"""
+Fast JSON Serialization
+=======================
+
+Serialization helpers for large LO Analysis API responses.
+
+- Encodes numpy scalars/arrays and pandas Timestamps natively instead of
+  falling back on ``default=str``
+- Builds record lists straight from a DataFrame's column arrays instead of
+  going through ``DataFrame.to_dict('records')``
+- Compresses responses (br/gzip) and tags them with ETags tied to the
+  analyzer's data and model version
+
+Every JSON response goes through json_response(): ``jsonify`` (health,
+metrics, error bodies) uses it via FastJSONProvider, so all responses are
+encoded and compressed the same way. Only endpoints whose body is derived
+from the versioned analyzer state pass an ETag; health, metrics, uploads
+and error responses are never cached. NaN and infinite floats are encoded
+as ``null`` with and without orjson.
+
+``orjson`` and ``brotli`` are used when installed; the standard library is
+used otherwise.
+
+Author: PLP Academic Management System
+Version: 1.0
+Purpose: Capstone Project - Smart Academic Management System
+"""
+
+from datetime import date, datetime
+import gzip
+import json
+import math
+
+import numpy as np
+import pandas as pd
+from flask import Response, has_request_context, request
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Responses smaller than this are sent uncompressed
+MIN_COMPRESS_BYTES = 1024
+
+
+def to_builtin(obj):
+    """
+    Convert numpy/pandas values to JSON-serializable Python values
+
+    Used as the ``default`` hook of the JSON encoders.
+
+    Args:
+        obj: Value the encoder could not serialize
+
+    Returns:
+        JSON-serializable equivalent of obj
+    """
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return None if np.isnan(obj) else float(obj)
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (pd.Timestamp, datetime, date)):
+        return None if pd.isna(obj) else obj.isoformat()
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+
+def _finite(obj):
+    """
+    Replace NaN/infinite floats with None (as orjson encodes them)
+
+    The stdlib encoder writes float subclasses such as np.float64 itself,
+    emitting the invalid JSON tokens NaN and Infinity without consulting
+    the ``default`` hook.
+    """
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {key: _finite(value) for key, value in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(value) for value in obj]
+    if isinstance(obj, np.ndarray) and obj.dtype.kind == 'f':
+        return _finite(obj.tolist())
+    return obj
+
+
+def _stdlib_dumps(obj, **kwargs):
+    """Standard library encoding with the same value handling as orjson"""
+    if kwargs.get('indent') is None:
+        kwargs.setdefault('separators', (',', ':'))
+    return json.dumps(_finite(obj), default=to_builtin, allow_nan=False, **kwargs)
+
+
+def dumps(obj):
+    """
+    Serialize obj to compact UTF-8 JSON bytes
+
+    Args:
+        obj: Payload to serialize
+
+    Returns:
+        bytes: JSON document
+    """
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            default=to_builtin,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        )
+    return _stdlib_dumps(obj).encode('utf-8')
+
+
+def _column_values(column):
+    """Convert one DataFrame column to a list of JSON-ready Python values"""
+    if pd.api.types.is_datetime64_any_dtype(column):
+        values = column.to_numpy(dtype='datetime64[s]').astype(str).tolist()
+        return [None if value == 'NaT' else value for value in values]
+
+    values = column.to_numpy()
+    if values.dtype.kind == 'f':
+        # tolist() converts the whole array to Python floats in one pass
+        return [None if math.isnan(value) else value for value in values.tolist()]
+    if values.dtype.kind in 'iub':
+        return values.tolist()
+    return [to_builtin(value) if isinstance(value, (np.generic, pd.Timestamp)) else value
+            for value in values.tolist()]
+
+
+def frame_to_records(frame, columns=None):
+    """
+    Build a list of record dicts from a DataFrame's column arrays
+
+    Each column is converted to Python values in a single vectorized pass,
+    which avoids the per-cell conversions of ``to_dict('records')``.
+
+    Args:
+        frame (pd.DataFrame): Frame to convert
+        columns (list, optional): Subset of columns to emit (default: all)
+
+    Returns:
+        list: One dict per row
+    """
+    columns = list(columns) if columns is not None else list(frame.columns)
+    column_values = [_column_values(frame[column]) for column in columns]
+    return [dict(zip(columns, row)) for row in zip(*column_values)]
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that understands numpy and pandas types"""
+
+    def dumps(self, obj, **kwargs):
+        # Formatting options (indent, sort_keys, ...) need the stdlib encoder
+        if kwargs:
+            return _stdlib_dumps(obj, **kwargs)
+        return dumps(obj).decode('utf-8')
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        if has_request_context():
+            # jsonify() gets the same encoding and compression as json_response()
+            return json_response(obj)
+        return self._app.response_class(dumps(obj), mimetype=self.mimetype)
+
+
+def version_etag(analyzer, *parts):
+    """
+    Build an ETag for a response derived from the analyzer's current state
+
+    Args:
+        analyzer (LOAnalyzer): Analyzer whose data/model version the response depends on
+        *parts: Extra values identifying the representation (e.g. query parameters)
+
+    Returns:
+        str: ETag value (without quotes)
+    """
+    # Versions are per-process counters that restart at 0 and diverge between
+    # workers; the random state tag keeps equal counters from matching
+    tag = f'{analyzer.state_tag}-d{analyzer.data_version}-m{analyzer.model_version}'
+    if parts:
+        tag += '-' + '-'.join(str(part) for part in parts)
+    return tag
+
+
+def not_modified(etag):
+    """
+    Return a 304 response if the client already has this version
+
+    Args:
+        etag (str): ETag of the current representation
+
+    Returns:
+        Response or None: 304 response, or None if the client needs the body
+    """
+    if etag is not None and request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+        response.set_etag(etag, weak=True)
+        return response
+    return None
+
+
+def json_response(payload, status=200, etag=None):
+    """
+    Serialize payload into a compressed, ETag-tagged JSON response
+
+    Args:
+        payload: JSON-serializable payload
+        status (int): HTTP status code
+        etag (str, optional): ETag of the representation
+
+    Returns:
+        Response: Flask response
+    """
+    body = dumps(payload)
+    response = Response(status=status, mimetype='application/json')
+
+    encoding = None
+    if len(body) >= MIN_COMPRESS_BYTES:
+        accepted = request.accept_encodings
+        if brotli is not None and accepted['br']:
+            body, encoding = brotli.compress(body, quality=4), 'br'
+        elif accepted['gzip']:
+            body, encoding = gzip.compress(body, compresslevel=5), 'gzip'
+
+    response.set_data(body)
+    response.headers['Vary'] = 'Accept-Encoding'
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if etag is not None:
+        response.set_etag(etag, weak=True)
+
+    return response
@@ -0,0 +1,210 @@
+"""
+Memory-Mapped Shared Analyzer State
+===================================
+
+Publishes the analyzer's read-only numeric state as versioned numpy files
+that every worker process on a host maps read-only with
+``np.load(mmap_mode='r')``. Mapped pages are clean file pages in the OS page
+cache, so all workers share one copy. Unlike copy-on-write memory inherited
+from a preloading master, these pages are never duplicated by reference
+counting or garbage collection.
+
+Layout of the state directory:
+
+    CURRENT                     Name of the current version directory
+    d5-m2-<ns>-<pid>/
+        meta.json               Versions, LO names and row counts
+        student_ids.npy         Sorted student IDs                       (students,)
+        offsets.npy             Row range of student i is offsets[i]:offsets[i + 1]
+        learning_outcome.npy    Index into meta['learning_outcomes']     (rows,)
+        avg_score.npy, score_std.npy, task_count.npy, achievement_rate.npy
+        rf_probability.npy, lr_probability.npy, ensemble_probability.npy
+
+Rows are the analyzer's (student, LO) summary rows sorted by student and LO.
+A version is written completely into its own directory before CURRENT is
+atomically replaced (os.replace), so readers always see a whole version.
+Readers check CURRENT at most once per check interval and switch versions
+without restarting.
+
+The arrays hold the predictions only. Each worker still keeps its own
+analyzer for reports, analytics and uploads, so publishing adds this copy
+rather than reducing per-worker memory. What it adds is one prediction
+state that every worker serves, whichever worker handled the last upload.
+
+Author: PLP Academic Management System
+Version: 1.0
+Purpose: Capstone Project - Smart Academic Management System
+"""
+
+from datetime import datetime
+import json
+import os
+import shutil
+import threading
+import time
+
+import numpy as np
+
+POINTER_FILE = 'CURRENT'
+
+# Row fields returned by SharedState.student_rows() -> published array
+ROW_ARRAYS = {
+    'current_achievement_rate': 'achievement_rate',
+    'current_avg_score': 'avg_score',
+    'score_std': 'score_std',
+    'task_count': 'task_count',
+    'rf_probability': 'rf_probability',
+    'lr_probability': 'lr_probability',
+    'ensemble_probability': 'ensemble_probability'
+}
+
+# Published versions kept on disk (older ones may still be mapped by slow workers)
+KEEP_VERSIONS = 3
+
+
+def publish(directory, arrays, meta, keep=KEEP_VERSIONS):
+    """
+    Write a new version and make it current
+
+    Args:
+        directory (str): State directory shared by the workers
+        arrays (dict): File stem -> numpy array
+        meta (dict): JSON-serializable metadata
+        keep (int): Number of versions to keep on disk
+
+    Returns:
+        str: Name of the published version
+    """
+    os.makedirs(directory, exist_ok=True)
+    name = f"d{meta['data_version']}-m{meta['model_version']}-{time.time_ns()}-{os.getpid()}"
+    path = os.path.join(directory, name)
+    staging = path + '.tmp'
+    os.makedirs(staging)
+
+    for stem, array in arrays.items():
+        np.save(os.path.join(staging, f'{stem}.npy'), np.ascontiguousarray(array))
+    with open(os.path.join(staging, 'meta.json'), 'w') as f:
+        json.dump({**meta, 'version': name, 'published_at': datetime.now().isoformat()}, f)
+    os.replace(staging, path)
+
+    # Atomically point readers at the new version
+    pointer = os.path.join(directory, f'{POINTER_FILE}.{os.getpid()}.tmp')
+    with open(pointer, 'w') as f:
+        f.write(name)
+    os.replace(pointer, os.path.join(directory, POINTER_FILE))
+
+    _remove_old_versions(directory, keep, name)
+    return name
+
+
+def _remove_old_versions(directory, keep, current):
+    """Delete all but the newest `keep` versions (never the current one)"""
+    versions = sorted(
+        (entry for entry in os.scandir(directory)
+         if entry.is_dir() and not entry.name.endswith('.tmp') and entry.name != current),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True
+    )
+    # Unlinking files that are still mapped is safe; the mapping stays valid
+    for entry in versions[max(keep - 1, 0):]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+class SharedState:
+    """One published version, mapped read-only"""
+
+    def __init__(self, path):
+        """
+        Map a published version
+
+        Args:
+            path (str): Version directory
+        """
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.version = self.meta['version']
+        self.learning_outcomes = np.asarray(self.meta['learning_outcomes'], dtype=object)
+        self.arrays = {
+            entry.name[:-len('.npy')]: np.load(entry.path, mmap_mode='r')
+            for entry in os.scandir(path) if entry.name.endswith('.npy')
+        }
+
+    def student_rows(self, student_id):
+        """
+        A student's summary features and prediction probabilities
+
+        Args:
+            student_id (int): Student ID
+
+        Returns:
+            list: One dict per LO (keys named like the analyzer's predictions
+                table columns); None if the student is not published or
+                student_id is not an integer
+        """
+        if isinstance(student_id, bool) or not isinstance(student_id, (int, np.integer)):
+            return None
+
+        student_ids = self.arrays['student_ids']
+        position = int(np.searchsorted(student_ids, student_id))
+        if position >= len(student_ids) or student_ids[position] != student_id:
+            return None
+
+        start, stop = self.arrays['offsets'][position:position + 2]
+        rows = slice(int(start), int(stop))
+        # A student has a handful of rows; plain dicts are far cheaper than a DataFrame
+        columns = {
+            'learning_outcome': self.learning_outcomes[self.arrays['learning_outcome'][rows]].tolist(),
+            **{column: self.arrays[array][rows].tolist() for column, array in ROW_ARRAYS.items()}
+        }
+        return [
+            {'student_id': int(student_id), 'model_version': self.meta['model_version'],
+             **dict(zip(columns, values))}
+            for values in zip(*columns.values())
+        ]
+
+
+class SharedStateReader:
+    """Follows the CURRENT pointer of a state directory"""
+
+    def __init__(self, directory, check_interval=1.0):
+        """
+        Initialize the reader (nothing is mapped until current() is called)
+
+        Args:
+            directory (str): State directory written by publish()
+            check_interval (float): Seconds between checks of the pointer file
+        """
+        self.directory = directory
+        self.check_interval = check_interval
+        self._state = None
+        self._checked_at = float('-inf')
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Check the pointer on the next current() call (e.g. right after this process published)"""
+        with self._lock:
+            self._checked_at = float('-inf')
+
+    def current(self):
+        """
+        The current published version
+
+        Returns:
+            SharedState: Mapped version, or None if nothing has been published
+        """
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._state
+
+        with self._lock:
+            if now - self._checked_at >= self.check_interval:
+                self._checked_at = now
+                try:
+                    with open(os.path.join(self.directory, POINTER_FILE)) as f:
+                        name = f.read().strip()
+                    if self._state is None or self._state.version != name:
+                        self._state = SharedState(os.path.join(self.directory, name))
+                except OSError:
+                    # Nothing published yet, or the version vanished; keep what we have
+                    pass
+            return self._state
@@ -0,0 +1,107 @@
+"""
+Single-Flight Request Coalescing
+================================
+
+Collapses concurrent identical computations into one. The first caller for
+a key runs the computation; callers arriving with the same key while it is
+still running wait for it and receive the same result (or exception)
+instead of repeating the work. Nothing is cached once the call completes,
+so keys should include everything the result depends on (endpoint,
+parameters and data/model version).
+
+Counts are kept per name (one name per endpoint):
+    calls       Requests that went through the coalescer
+    executions  Computations actually run
+    coalesced   Requests served by another request's computation
+    errors      Computations that raised
+    in_flight   Computations running right now
+
+Author: PLP Academic Management System
+Version: 1.0
+Purpose: Capstone Project - Smart Academic Management System
+"""
+
+from collections import Counter
+import threading
+
+
+class _Call:
+    """One in-flight computation and the callers waiting on it"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Run each distinct (name, key) computation at most once at a time"""
+
+    def __init__(self):
+        """Initialize an empty coalescer"""
+        self._calls = {}
+        self._counts = {}
+        self._lock = threading.Lock()
+
+    def do(self, name, key, func):
+        """
+        Run func, or wait for an identical call that is already running
+
+        Args:
+            name (str): Group the call is counted under (e.g. the endpoint)
+            key (hashable): Identity of the computation within the group
+            func (callable): Computation to run; takes no arguments
+
+        Returns:
+            object: The computation's result, shared by every coalesced caller
+        """
+        with self._lock:
+            counts = self._counts.setdefault(name, Counter())
+            counts['calls'] += 1
+            call = self._calls.get((name, key))
+            leader = call is None
+            if leader:
+                call = self._calls[(name, key)] = _Call()
+                counts['executions'] += 1
+            else:
+                counts['coalesced'] += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+        except Exception as e:
+            call.error = e
+            with self._lock:
+                counts['errors'] += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[(name, key)]
+            call.done.set()
+
+        return call.result
+
+    def stats(self):
+        """
+        Coalescing counts per name
+
+        Returns:
+            dict: name -> calls, executions, coalesced, errors and in_flight
+        """
+        with self._lock:
+            in_flight = Counter(name for name, _ in self._calls)
+            return {
+                name: {
+                    'calls': counts['calls'],
+                    'executions': counts['executions'],
+                    'coalesced': counts['coalesced'],
+                    'errors': counts['errors'],
+                    'in_flight': in_flight[name]
+                }
+                for name, counts in self._counts.items()
+            }
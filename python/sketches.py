@@ -0,0 +1,203 @@
+"""
+Streaming Quantile Sketches
+===========================
+
+A compact merging t-digest for score distributions and percentile ranks.
+
+Values are buffered and periodically merged into at most ~compression/2
+weighted centroids. Centroids are small near the tails and larger around
+the median (k1 scale function), so extreme percentiles stay accurate while
+memory stays bounded no matter how many scores are added. Digests can be
+merged, so per-LO and per-course sketches can be combined freely.
+
+Author: PLP Academic Management System
+Version: 1.0
+Purpose: Capstone Project - Smart Academic Management System
+"""
+
+import numpy as np
+
+# Default histogram bins, matching the analyzer's score categories
+SCORE_BINS = [0, 60, 70, 80, 90, 100]
+SCORE_BIN_LABELS = ['Failing', 'Below Average', 'Average', 'Good', 'Excellent']
+
+
+class TDigest:
+    """Mergeable quantile sketch with bounded memory"""
+
+    def __init__(self, compression=200, buffer_size=2000):
+        """
+        Initialize an empty digest
+
+        Args:
+            compression (float): Accuracy/size trade-off; about compression/2 centroids are kept
+            buffer_size (int): Number of raw values buffered before merging
+        """
+        self.compression = compression
+        self.buffer_size = buffer_size
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self._buffer = []
+        self._buffered = 0
+
+    def add(self, values):
+        """
+        Add raw values to the digest
+
+        Args:
+            values (array-like): Values to add (NaNs are ignored)
+        """
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+
+        self._buffer.append(values)
+        self._buffered += values.size
+        self.count += values.size
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+
+        if self._buffered >= self.buffer_size:
+            self._compress()
+
+    def merge(self, other):
+        """
+        Fold another digest into this one
+
+        Args:
+            other (TDigest): Digest to merge
+        """
+        other._compress()
+        if other.count == 0:
+            return
+        self._compress(other.means, other.weights)
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    def _compress(self, extra_means=None, extra_weights=None):
+        """Merge buffered values (and optional extra centroids) into the centroid list"""
+        parts_m = [self.means] + self._buffer
+        parts_w = [self.weights] + [np.ones(values.size) for values in self._buffer]
+        if extra_means is not None:
+            parts_m.append(extra_means)
+            parts_w.append(extra_weights)
+        self._buffer, self._buffered = [], 0
+
+        means = np.concatenate(parts_m)
+        if means.size == 0:
+            return
+        weights = np.concatenate(parts_w)
+
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+
+        # Centroids may only span one unit of the k1 scale, which is steep at the tails
+        total = weights.sum()
+        q = (np.cumsum(weights) - weights / 2) / total
+        k = self.compression / (2 * np.pi) * np.arcsin(2 * q - 1)
+        bucket = np.floor(k)
+
+        starts = np.flatnonzero(np.r_[True, bucket[1:] != bucket[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+
+    def _interpolation_points(self):
+        """Cumulative weights at centroid centers, padded with the exact min and max"""
+        self._compress()
+        centers = np.cumsum(self.weights) - self.weights / 2
+        ranks = np.concatenate([[0.0], centers, [float(self.count)]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return ranks, values
+
+    def quantile(self, q):
+        """
+        Estimate quantile(s)
+
+        Args:
+            q (float or array-like): Quantile(s) in [0, 1]
+
+        Returns:
+            float or np.ndarray: Estimated value(s); NaN for an empty digest
+        """
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else float('nan')
+        ranks, values = self._interpolation_points()
+        result = np.interp(np.asarray(q, dtype=float) * self.count, ranks, values)
+        return result if np.ndim(q) else float(result)
+
+    def cdf(self, x):
+        """
+        Estimate the fraction of values <= x
+
+        Args:
+            x (float or array-like): Value(s)
+
+        Returns:
+            float or np.ndarray: Fraction(s) in [0, 1]; NaN for an empty digest
+        """
+        if self.count == 0:
+            return np.full(np.shape(x), np.nan) if np.ndim(x) else float('nan')
+        ranks, values = self._interpolation_points()
+        result = np.interp(np.asarray(x, dtype=float), values, ranks,
+                           left=0.0, right=float(self.count)) / self.count
+        return result if np.ndim(x) else float(result)
+
+    def percentile_rank(self, x):
+        """
+        Percentile rank (0-100) of a value within the digest
+
+        Args:
+            x (float): Value to rank
+
+        Returns:
+            float: Percentile rank; None for an empty digest
+        """
+        if self.count == 0:
+            return None
+        return round(100 * self.cdf(x), 1)
+
+    def histogram(self, bins=SCORE_BINS):
+        """
+        Estimate counts per bin
+
+        Args:
+            bins (list): Bin edges; the first bin also counts values below it and
+                the last bin values above it
+
+        Returns:
+            list: Estimated count per bin
+        """
+        if self.count == 0:
+            return [0] * (len(bins) - 1)
+        cumulative = np.round(self.cdf(np.asarray(bins, dtype=float)) * self.count)
+        cumulative[0], cumulative[-1] = 0.0, float(self.count)
+        return [int(n) for n in np.diff(cumulative)]
+
+    def summary(self, quantiles=(0.1, 0.25, 0.5, 0.75, 0.9), bins=SCORE_BINS, labels=SCORE_BIN_LABELS):
+        """
+        JSON-ready distribution summary
+
+        Args:
+            quantiles (tuple): Quantiles to report
+            bins (list): Histogram bin edges
+            labels (list): Histogram bin labels
+
+        Returns:
+            dict: Count, min/max, quantiles and histogram
+        """
+        if self.count == 0:
+            return {'count': 0}
+        estimates = self.quantile(list(quantiles))
+        return {
+            'count': int(self.count),
+            'min': round(self.min, 2),
+            'max': round(self.max, 2),
+            'quantiles': {f'p{int(q * 100)}': round(float(v), 2) for q, v in zip(quantiles, estimates)},
+            'histogram': dict(zip(labels, self.histogram(bins))),
+            'centroids': int(self.means.size)
+        }
@@ -0,0 +1,81 @@
+"""
+Upsert behaviour of LOAnalyzer.ingest_scores
+
+Run from the repository root:
+    python -m pytest python/tests
+"""
+
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lo_analyzer import LOAnalyzer, SCORE_COLUMNS  # noqa: E402
+
+REQUIRED_ONLY = ['student_id', 'student_name', 'task_id', 'task_title',
+                 'score', 'total_score', 'learning_outcomes']
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    scores = pd.DataFrame({
+        'student_id': [1, 1, 2, 2],
+        'student_name': ['Ana', 'Ana', 'Ben', 'Ben'],
+        'course': ['Capstone 1'] * 4,
+        'subject': ['BSIT3B'] * 4,
+        'task_id': [1, 2, 1, 2],
+        'task_title': ['Proposal', 'Design', 'Proposal', 'Design'],
+        'score': [85, 60, 70, 90],
+        'total_score': [100] * 4,
+        'date_submitted': ['2025-01-15', '2025-01-22', '2025-01-15', '2025-01-22'],
+        'learning_outcomes': ['LO1', 'LO1;LO2', 'LO1', 'LO1;LO2'],
+        'topic': ['Capstone Overview', 'System Design', 'Capstone Overview', 'System Design']
+    })
+    path = tmp_path / 'scores.csv'
+    scores[SCORE_COLUMNS].to_csv(path, index=False)
+
+    analyzer = LOAnalyzer(csv_path=str(path))
+    analyzer.preprocess_data()
+    return analyzer
+
+
+def test_partial_resend_is_unchanged(analyzer):
+    stored = analyzer.data[SCORE_COLUMNS].iloc[[0]].copy()
+
+    decision = analyzer.ingest_scores(stored[REQUIRED_ONLY])
+
+    assert decision['batch']['unchanged'] == 1
+    assert decision['batch']['updated'] == 0
+    after = analyzer.data[SCORE_COLUMNS].iloc[[0]]
+    for field in ('course', 'subject', 'topic', 'date_submitted'):
+        assert after[field].iloc[0] == stored[field].iloc[0]
+    assert analyzer.roster.set_index('student_id').loc[1, 'course'] == 'Capstone 1'
+
+
+def test_partial_update_keeps_stored_optional_fields(analyzer):
+    stored = analyzer.data[SCORE_COLUMNS].iloc[[0]].copy()
+
+    decision = analyzer.ingest_scores(stored[REQUIRED_ONLY].assign(score=50))
+
+    assert decision['batch']['updated'] == 1
+    after = analyzer.data[SCORE_COLUMNS].iloc[0]
+    assert after['score'] == 50
+    assert after['course'] == 'Capstone 1'
+    assert after['date_submitted'] == stored['date_submitted'].iloc[0]
+
+
+def test_partial_insert_gets_defaults(analyzer):
+    new = pd.DataFrame([{'student_id': 3, 'student_name': 'Cy', 'task_id': 1, 'task_title': 'Proposal',
+                         'score': 75, 'total_score': 100, 'learning_outcomes': 'LO1'}])
+
+    decision = analyzer.ingest_scores(new)
+
+    assert decision['batch']['inserted'] == 1
+    inserted = analyzer.data[analyzer.data['student_id'] == 3].iloc[0]
+    assert inserted['course'] == 'Unknown Course'
+    assert inserted['subject'] == 'Unknown Subject'
+    assert inserted['topic'] == 'Unknown Topic'
+    assert not pd.isna(inserted['date_submitted'])